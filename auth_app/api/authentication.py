@@ -2,11 +2,18 @@
 Custom JWT authentication using HTTP-only cookies.
 
 Falls back to header-based JWT authentication if no cookie is present.
+With AUTH_STATELESS_JWT the user is built from the token claims
+instead of being loaded from the database.
 """
 
+from django.conf import settings
+from django.utils.functional import cached_property
 from rest_framework import exceptions
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.models import TokenUser
+
+from auth_app.utils.user_cache import get_cached_user, is_token_revoked
 
 
 class CookieJWTAuthentication(JWTAuthentication):
@@ -28,3 +35,50 @@ class CookieJWTAuthentication(JWTAuthentication):
             return None
 
         return user, validated_token
+
+    def get_user(self, validated_token):
+        """
+        Return the user of a token, without a database query in stateless mode.
+
+        Stateless tokens are rejected once revoked by logout or by a
+        change to the user, so deactivation takes effect immediately.
+        """
+        if not settings.AUTH_STATELESS_JWT:
+            return super().get_user(validated_token)
+
+        if is_token_revoked(validated_token):
+            raise InvalidToken("Token has been revoked.")
+
+        user = ClaimsUser(validated_token)
+        if not user.is_active:
+            raise InvalidToken("User is inactive.")
+
+        return user
+
+
+class ClaimsUser(TokenUser):
+    """
+    Lightweight user built from the claims of an access token.
+
+    Staff flags are read from the cached user fields, so permission
+    changes apply as soon as the user cache is invalidated.
+    """
+
+    @cached_property
+    def is_active(self):
+        return bool(self.token.get("is_active", False))
+
+    @cached_property
+    def is_staff(self):
+        return bool(self.cached_fields and self.cached_fields["is_staff"])
+
+    @cached_property
+    def is_superuser(self):
+        return bool(self.cached_fields and self.cached_fields["is_superuser"])
+
+    @cached_property
+    def cached_fields(self):
+        """
+        User fields loaded from the Redis-backed user cache.
+        """
+        return get_cached_user(self.id)
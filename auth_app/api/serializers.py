@@ -60,6 +60,16 @@ class LoginSerializer(TokenObtainPairSerializer):
         if "username" in self.fields:
             self.fields.pop("username")
 
+    @classmethod
+    def get_token(cls, user):
+        """
+        Add the claims the stateless authentication builds its user from.
+        """
+        token = super().get_token(user)
+        token["username"] = user.username
+        token["is_active"] = user.is_active
+        return token
+
     def validate(self, attrs):
         email = attrs.get("email")
         password = attrs.get("password")
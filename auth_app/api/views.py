@@ -14,11 +14,12 @@ from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework_simplejwt.exceptions import InvalidToken
-from rest_framework_simplejwt.tokens import RefreshToken, TokenError
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken, TokenError
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
 from auth_app.utils.email_activation import activate_user
 from auth_app.utils.reset_password import reset_user_password, send_reset_email
+from auth_app.utils.user_cache import revoke_token
 from .serializers import (
     ConfirmPasswordSerializer,
     LoginSerializer,
@@ -125,12 +126,13 @@ class LoginView(TokenObtainPairView):
 
 class LogoutView(APIView):
     """
-    Log out a user by invalidating the refresh token
-    and deleting authentication cookies.
+    Log out a user by invalidating the refresh token, revoking
+    the access token and deleting authentication cookies.
     """
 
     def post(self, request, *args, **kwargs):
         refresh_cookie = request.COOKIES.get("refresh_token")
+        access_cookie = request.COOKIES.get("access_token")
 
         if refresh_cookie:
             try:
@@ -139,6 +141,12 @@ class LogoutView(APIView):
             except TokenError:
                 pass
 
+        if access_cookie:
+            try:
+                revoke_token(AccessToken(access_cookie))
+            except TokenError:
+                pass
+
         response = Response(
             {
                 "detail": (
@@ -2,14 +2,20 @@
 Signals for the auth_app.
 
 Handles side effects related to user lifecycle events,
-such as sending activation emails after registration.
+such as sending activation emails after registration and
+keeping the user cache of the stateless JWT mode in sync.
 """
 
 from django.contrib.auth.models import User
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
 from auth_app.utils.email_activation import send_activation_email
+from auth_app.utils.user_cache import invalidate_cached_user, revoke_user_tokens
+
+# Saves touching only these fields keep the user's tokens valid
+NON_REVOKING_FIELDS = {"last_login"}
 
 
 @receiver(post_save, sender=User)
@@ -19,3 +25,39 @@ def send_activation_email_on_registration(sender, instance, created, **kwargs):
     """
     if created and not instance.is_active:
         send_activation_email(instance)
+
+
+@receiver(post_save, sender=User)
+def refresh_user_cache(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Invalidate the cached user and revoke its tokens after a change.
+
+    Deactivation, password or permission changes therefore take effect
+    on the next request. Login only updates last_login and is skipped.
+    """
+    if created:
+        return
+
+    user_id = instance.pk
+    revoke = update_fields is None or not set(update_fields) <= NON_REVOKING_FIELDS
+
+    def on_commit():
+        invalidate_cached_user(user_id)
+        if revoke:
+            revoke_user_tokens(user_id)
+
+    transaction.on_commit(on_commit)
+
+
+@receiver(post_delete, sender=User)
+def revoke_deleted_user(sender, instance, **kwargs):
+    """
+    Revoke the tokens of a deleted user.
+    """
+    user_id = instance.pk
+
+    def on_commit():
+        invalidate_cached_user(user_id)
+        revoke_user_tokens(user_id)
+
+    transaction.on_commit(on_commit)
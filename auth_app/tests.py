@@ -0,0 +1,112 @@
+"""
+Tests for the user cache and token revocation of the stateless JWT mode.
+"""
+
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from auth_app.utils.user_cache import (
+    USER_CACHE_FIELDS,
+    get_cached_user,
+    is_token_revoked,
+    revoke_token,
+    revoke_user_tokens,
+    revoked_token_key,
+    revoked_user_key,
+    user_key,
+)
+
+# Time of the revocations in these tests, within second 1_000_000
+REVOKED_AT = 1_000_000.5
+
+
+class TokenRevocationTests(TestCase):
+    """
+    Revocation of single tokens and of all tokens of a user.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="viewer@example.com",
+            email="viewer@example.com",
+            password="secret-password",
+        )
+        self.user_id = self.user.id
+
+    def tearDown(self):
+        cache.delete_many([user_key(self.user_id), revoked_user_key(self.user_id)])
+
+    def token(self, issued_at):
+        token = AccessToken.for_user(self.user)
+        token["iat"] = issued_at
+        return token
+
+    def revocation_time(self):
+        """
+        Fix the revocation time without changing the clock of the cache.
+        """
+        patcher = mock.patch("auth_app.utils.user_cache.time")
+        patcher.start().time.return_value = REVOKED_AT
+        self.addCleanup(patcher.stop)
+
+    def revoke_user(self):
+        self.revocation_time()
+        revoke_user_tokens(self.user_id)
+
+    def test_tokens_are_valid_without_revocation(self):
+        self.assertFalse(is_token_revoked(self.token(999_999)))
+
+    def test_tokens_issued_before_the_revocation_are_rejected(self):
+        self.revoke_user()
+
+        self.assertTrue(is_token_revoked(self.token(999_999)))
+
+    def test_tokens_issued_after_the_revocation_are_accepted(self):
+        self.revoke_user()
+
+        self.assertFalse(is_token_revoked(self.token(1_000_001)))
+
+    def test_same_second_tokens_are_accepted_while_the_user_is_active(self):
+        self.revoke_user()
+
+        self.assertFalse(is_token_revoked(self.token(1_000_000)))
+
+    def test_same_second_tokens_are_rejected_after_deactivation(self):
+        token = self.token(1_000_000)
+
+        self.revocation_time()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+
+        self.assertTrue(is_token_revoked(token))
+
+    def test_same_second_tokens_are_rejected_after_deletion(self):
+        token = self.token(1_000_000)
+
+        self.revocation_time()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.delete()
+
+        self.assertTrue(is_token_revoked(token))
+
+    def test_single_token_revocation(self):
+        token = self.token(999_999)
+        other = self.token(999_999)
+
+        revoke_token(token)
+
+        self.assertTrue(is_token_revoked(token))
+        self.assertFalse(is_token_revoked(other))
+        cache.delete(revoked_token_key(token["jti"]))
+
+    def test_cache_holds_only_the_user_flags(self):
+        cached = get_cached_user(self.user_id)
+
+        self.assertEqual(set(cached), set(USER_CACHE_FIELDS))
+        self.assertEqual(cache.get(user_key(self.user_id)), cached)
+        self.assertIsNone(get_cached_user(self.user_id + 1000))
@@ -0,0 +1,109 @@
+"""
+Utilities for the Redis-backed user cache and token revocation.
+
+Used by the stateless JWT mode: authenticated requests build their
+user from token claims and only consult Redis to check whether the
+token was revoked. Permission flags are read from the user cache
+instead of the database.
+"""
+
+import math
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from rest_framework_simplejwt.settings import api_settings
+
+# User fields kept in the cache, never the password hash or personal data
+USER_CACHE_FIELDS = ("is_active", "is_staff", "is_superuser")
+
+
+def get_cached_user(user_id):
+    """
+    Return the USER_CACHE_FIELDS of a user as a dict, cached on a miss.
+
+    Returns None if the user does not exist.
+    """
+    key = user_key(user_id)
+    user = cache.get(key)
+    if user is None:
+        user = User.objects.filter(pk=user_id).values(*USER_CACHE_FIELDS).first()
+        if user is not None:
+            cache.set(key, user, settings.AUTH_USER_CACHE_TIMEOUT)
+    return user
+
+
+def invalidate_cached_user(user_id):
+    """
+    Remove a user from the cache.
+    """
+    cache.delete(user_key(user_id))
+
+
+def revoke_user_tokens(user_id):
+    """
+    Reject every access token issued to a user before now.
+    """
+    cache.set(
+        revoked_user_key(user_id),
+        time.time(),
+        int(api_settings.ACCESS_TOKEN_LIFETIME.total_seconds()),
+    )
+
+
+def revoke_token(token):
+    """
+    Reject a single access token until it expires.
+    """
+    remaining = int(token["exp"] - time.time())
+    if remaining > 0:
+        cache.set(revoked_token_key(token[api_settings.JTI_CLAIM]), True, remaining)
+
+
+def is_token_revoked(token):
+    """
+    Return whether an access token or all tokens of its user were revoked.
+
+    Both checks are answered by a single round trip to Redis. The `iat`
+    claim only has whole seconds, so a token issued in the second of a
+    revocation may predate it. Such a token is only accepted while the
+    user still exists and is active.
+    """
+    user_id = token[api_settings.USER_ID_CLAIM]
+    jti = token.get(api_settings.JTI_CLAIM)
+    revoked = cache.get_many([revoked_user_key(user_id), revoked_token_key(jti)])
+
+    if revoked.get(revoked_token_key(jti)):
+        return True
+
+    revoked_at = revoked.get(revoked_user_key(user_id))
+    if revoked_at is None:
+        return False
+
+    issued_at = token.get("iat", 0)
+    if issued_at == math.floor(revoked_at):
+        user = get_cached_user(user_id)
+        return user is None or not user["is_active"]
+    return issued_at < revoked_at
+
+
+def user_key(user_id):
+    """
+    Return the cache key of a user's cached fields.
+    """
+    return f"auth_user_fields:{user_id}"
+
+
+def revoked_user_key(user_id):
+    """
+    Return the cache key of the time all of a user's tokens were revoked.
+    """
+    return f"auth_revoked_user:{user_id}"
+
+
+def revoked_token_key(jti):
+    """
+    Return the cache key marking a single token as revoked.
+    """
+    return f"auth_revoked_token:{jti}"
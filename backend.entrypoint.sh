@@ -18,6 +18,12 @@ python manage.py collectstatic --noinput
 python manage.py makemigrations
 python manage.py migrate
 
+# Re-enqueue videos whose conversion died with a previous container
+python manage.py reap_stuck_videos
+
+# Index ready videos published before manifest indexes existed
+python manage.py build_manifest_indexes
+
 # Create a superuser using environment variables
 # (Dein Superuser-Erstellungs-Code bleibt gleich)
 python manage.py shell <<EOF
@@ -38,6 +44,33 @@ else:
     print(f"Superuser '{username}' already exists.")
 EOF
 
-python manage.py rqworker default &
+# Start several workers so fanned-out conversion jobs run in parallel
+RQ_WORKERS="${RQ_WORKERS:-1}"
+RQ_WORKER_QUEUES="default"
+if [ -n "$VIDEO_TRANSCODE_QUEUE" ] && [ "$VIDEO_TRANSCODE_QUEUE" != "default" ]; then
+  RQ_WORKER_QUEUES="$RQ_WORKER_QUEUES $VIDEO_TRANSCODE_QUEUE"
+fi
+
+i=0
+while [ "$i" -lt "$RQ_WORKERS" ]; do
+  python manage.py rqworker $RQ_WORKER_QUEUES &
+  i=$((i + 1))
+done
+
+# Keep re-enqueuing videos whose worker died while this container runs,
+# not only those left behind by a previous one
+VIDEO_REAP_INTERVAL="${VIDEO_REAP_INTERVAL:-300}"
+while sleep "$VIDEO_REAP_INTERVAL"; do
+  python manage.py reap_stuck_videos || true
+done &
+
+# SERVER_INTERFACE=asgi serves the project with uvicorn, so async delivery
+# views (VIDEO_ASYNC_DELIVERY=True) stream segments without a thread each
+WEB_WORKERS="${WEB_WORKERS:-1}"
+if [ "$SERVER_INTERFACE" = "asgi" ]; then
+  exec uvicorn core.asgi:application --host 0.0.0.0 --port 8000 \
+    --workers "$WEB_WORKERS" --timeout-keep-alive 30
+fi
 
-exec gunicorn core.wsgi:application --bind 0.0.0.0:8000 --reload --timeout 300
+exec gunicorn core.wsgi:application --bind 0.0.0.0:8000 --reload --timeout 300 \
+  --workers "$WEB_WORKERS"
@@ -43,6 +43,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'django_rq',
     'rest_framework',
     'rest_framework_simplejwt',
@@ -128,6 +129,90 @@ RQ_QUEUES = {
     },
 }
 
+# Video list pagination (opt-in via ?page_size= or ?cursor=): default and
+# largest page size
+VIDEO_LIST_PAGE_SIZE = int(os.getenv("VIDEO_LIST_PAGE_SIZE", 24))
+VIDEO_LIST_MAX_PAGE_SIZE = int(os.getenv("VIDEO_LIST_MAX_PAGE_SIZE", 100))
+# Maximum number of results of the search endpoint
+VIDEO_SEARCH_LIMIT = int(os.getenv("VIDEO_SEARCH_LIMIT", 50))
+# Videos per category row of the dashboard endpoint (?per_category=)
+VIDEO_DASHBOARD_ROW_SIZE = int(os.getenv("VIDEO_DASHBOARD_ROW_SIZE", 10))
+# Seconds rendered list responses stay in Redis (0 disables the cache), and
+# the longest a request waits for a concurrent rebuild of the same list
+VIDEO_LIST_CACHE_TIMEOUT = int(os.getenv("VIDEO_LIST_CACHE_TIMEOUT", 3600))
+VIDEO_LIST_LOCK_TIMEOUT = int(os.getenv("VIDEO_LIST_LOCK_TIMEOUT", 10))
+
+# Video processing settings
+# Fan out every rendition and the thumbnail into separate RQ jobs
+VIDEO_FAN_OUT = os.getenv("VIDEO_FAN_OUT", "False") == "True"
+VIDEO_TRANSCODE_QUEUE = os.getenv("VIDEO_TRANSCODE_QUEUE", "default")
+RQ_QUEUES.setdefault(VIDEO_TRANSCODE_QUEUE, RQ_QUEUES["default"])
+# Times a conversion abandoned by its worker is re-enqueued before the
+# video is marked as failed
+VIDEO_MAX_CONVERSION_RETRIES = int(os.getenv("VIDEO_MAX_CONVERSION_RETRIES", 3))
+
+# HLS segment format: "mpegts" (one .ts file per segment) or "fmp4"
+# (one CMAF file per rendition, segments addressed by byte range)
+VIDEO_HLS_SEGMENT_TYPE = os.getenv("VIDEO_HLS_SEGMENT_TYPE", "mpegts")
+
+# How media files are delivered: "django" streams them from the worker,
+# "nginx" hands them to the proxy via X-Accel-Redirect and "sendfile"
+# via X-Sendfile (Apache mod_xsendfile, lighttpd, Caddy)
+VIDEO_DELIVERY_MODE = os.getenv("VIDEO_DELIVERY_MODE", "django")
+# Internal nginx location aliased to MEDIA_ROOT
+VIDEO_ACCEL_REDIRECT_PREFIX = os.getenv("VIDEO_ACCEL_REDIRECT_PREFIX", "/protected-media/")
+
+# Serve playlists and segments with async views (requires the ASGI profile,
+# SERVER_INTERFACE=asgi, as async views under WSGI gain nothing)
+VIDEO_ASYNC_DELIVERY = os.getenv("VIDEO_ASYNC_DELIVERY", "False") == "True"
+
+# Ready-video lookups of playlist and segment requests: seconds in Redis,
+# and seconds and entries in the per-process LRU in front of it
+VIDEO_READY_CACHE_TIMEOUT = int(os.getenv("VIDEO_READY_CACHE_TIMEOUT", 300))
+VIDEO_READY_LOCAL_TTL = int(os.getenv("VIDEO_READY_LOCAL_TTL", 5))
+VIDEO_READY_LOCAL_SIZE = int(os.getenv("VIDEO_READY_LOCAL_SIZE", 1024))
+# Manifest indexes of published videos, cached per process like the above
+VIDEO_MANIFEST_LOCAL_TTL = int(os.getenv("VIDEO_MANIFEST_LOCAL_TTL", 60))
+VIDEO_MANIFEST_LOCAL_SIZE = int(os.getenv("VIDEO_MANIFEST_LOCAL_SIZE", 128))
+
+# Hot segment cache of the "django" delivery mode: "" (off), "local" (per
+# process) or "redis" (shared), its byte budget and largest cached segment
+VIDEO_SEGMENT_CACHE = os.getenv("VIDEO_SEGMENT_CACHE", "")
+VIDEO_SEGMENT_CACHE_BYTES = int(os.getenv("VIDEO_SEGMENT_CACHE_BYTES", 256 * 1024 * 1024))
+VIDEO_SEGMENT_CACHE_MAX_ITEM_BYTES = int(os.getenv("VIDEO_SEGMENT_CACHE_MAX_ITEM_BYTES", 8 * 1024 * 1024))
+# Comma-separated admission policies a segment must pass to be cached:
+# "always", "first_segments" and "repeat_hits"
+VIDEO_SEGMENT_CACHE_ADMISSION = os.getenv("VIDEO_SEGMENT_CACHE_ADMISSION", "first_segments").split(",")
+# Segments admitted by "first_segments" (6 segments = the first minute)
+VIDEO_SEGMENT_CACHE_FIRST_SEGMENTS = int(os.getenv("VIDEO_SEGMENT_CACHE_FIRST_SEGMENTS", 6))
+# Requests within the window before "repeat_hits" admits a segment
+VIDEO_SEGMENT_CACHE_MIN_HITS = int(os.getenv("VIDEO_SEGMENT_CACHE_MIN_HITS", 2))
+VIDEO_SEGMENT_CACHE_HIT_WINDOW = int(os.getenv("VIDEO_SEGMENT_CACHE_HIT_WINDOW", 600))
+
+# Rewrite rendition playlists with HMAC-signed segment URLs, so segment
+# requests skip JWT authentication. The TTL must cover a whole viewing
+# session, as players do not reload VOD playlists.
+VIDEO_SIGNED_SEGMENT_URLS = os.getenv("VIDEO_SIGNED_SEGMENT_URLS", "True") == "True"
+VIDEO_SEGMENT_URL_TTL = int(os.getenv("VIDEO_SEGMENT_URL_TTL", 4 * 60 * 60))
+
+# Split long originals at keyframes and transcode the chunks in a process pool
+# (MPEG-TS renditions only)
+VIDEO_CHUNKED_TRANSCODING = os.getenv("VIDEO_CHUNKED_TRANSCODING", "False") == "True"
+VIDEO_CHUNK_SECONDS = int(os.getenv("VIDEO_CHUNK_SECONDS", 120))
+# 0 sizes the pool to the available CPU cores
+VIDEO_CHUNK_WORKERS = int(os.getenv("VIDEO_CHUNK_WORKERS", 0))
+
+# Scrubbing previews: seconds between sprite tiles and tile width in pixels
+VIDEO_TRICKPLAY_INTERVAL = int(os.getenv("VIDEO_TRICKPLAY_INTERVAL", 10))
+VIDEO_TRICKPLAY_WIDTH = int(os.getenv("VIDEO_TRICKPLAY_WIDTH", 160))
+
+# Responsive thumbnail derivatives generated with Pillow
+VIDEO_THUMBNAIL_WIDTHS = [
+    int(width)
+    for width in os.getenv("VIDEO_THUMBNAIL_WIDTHS", "320,640,1280").split(",")
+]
+VIDEO_THUMBNAIL_FORMATS = os.getenv("VIDEO_THUMBNAIL_FORMATS", "avif,webp").split(",")
+
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
 
@@ -194,6 +279,12 @@ REST_FRAMEWORK = {
     ],
 }
 
+# Build the authenticated user from JWT claims instead of the database.
+# Revocations are checked in Redis, the full user model is cached there
+# for at most AUTH_USER_CACHE_TIMEOUT seconds.
+AUTH_STATELESS_JWT = os.getenv("AUTH_STATELESS_JWT", "False") == "True"
+AUTH_USER_CACHE_TIMEOUT = int(os.getenv("AUTH_USER_CACHE_TIMEOUT", 300))
+
 # Email settings
 EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
 
@@ -5,6 +5,7 @@ Admin configuration for the video_app.
 from django.contrib import admin
 
 from .models import Video
+from .utils.search import search_videos
 
 
 @admin.register(Video)
@@ -15,6 +16,38 @@ class VideoAdmin(admin.ModelAdmin):
 
     list_display = ("title", "category", "status", "created_at")
     list_filter = ("status", "category", "created_at")
+    # Enables the search box; get_search_results replaces the ILIKE lookups
     search_fields = ("title", "description", "category")
-    fields = ("created_at", "title", "description", "category", "original_file")
-    readonly_fields = ("created_at", "status")
+    fields = (
+        "created_at",
+        "title",
+        "description",
+        "category",
+        "original_file",
+        "width",
+        "height",
+        "duration",
+        "video_codec",
+        "audio_codec",
+        "frame_rate",
+        "bitrate",
+    )
+    readonly_fields = (
+        "created_at",
+        "status",
+        "width",
+        "height",
+        "duration",
+        "video_codec",
+        "audio_codec",
+        "frame_rate",
+        "bitrate",
+    )
+
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Search through the full-text index used by the search endpoint.
+        """
+        if not search_term.strip():
+            return queryset, False
+        return search_videos(queryset, search_term), False
@@ -0,0 +1,202 @@
+"""
+Async API views for HLS video delivery.
+
+Used instead of the playlist and segment views of video_app.api.views
+when VIDEO_ASYNC_DELIVERY is enabled and the project is served via
+ASGI. Files are streamed as async iterators, so an in-flight download
+holds a coroutine instead of a worker thread. Authentication, signed
+URLs, ready checks and cache headers behave like the sync views.
+"""
+
+import asyncio
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.settings import api_settings
+
+from video_app.utils.delivery import content_response, media_response
+from video_app.utils.manifest_index import ROOT_KEY, lookup_file
+from video_app.utils.ready_cache import is_video_ready
+from video_app.utils.segment_cache import cached_segment
+from video_app.utils.signed_urls import (
+    sign_playlist,
+    signed_query,
+    verify_signed_request,
+)
+from .views import (
+    MEDIA_ROOT,
+    PLAYLIST_CACHE_CONTROL,
+    SEGMENT_CACHE_CONTROL,
+    SEGMENT_FILES,
+    match_content_type,
+    signed_cache_control,
+)
+
+
+@require_GET
+async def master_playlist_view(request, movie_id: int):
+    """
+    Serve the HLS master playlist (master.m3u8) listing every resolution.
+    """
+    denied = await authorize(request, movie_id)
+    if denied:
+        return denied
+
+    master_path = (
+        MEDIA_ROOT / "videos" / f"video_{movie_id}" / "processed" / "master.m3u8"
+    )
+
+    entry = await sync_to_async(lookup_file)(movie_id, ROOT_KEY, "master.m3u8")
+    if entry is None:
+        return not_found()
+
+    return await asyncio.to_thread(
+        media_response,
+        request,
+        master_path,
+        "application/vnd.apple.mpegurl",
+        PLAYLIST_CACHE_CONTROL,
+        asynchronous=True,
+        entry=entry,
+    )
+
+
+@require_GET
+async def playlist_view(request, movie_id: int, resolution: str):
+    """
+    Serve the HLS playlist (index.m3u8) for a given video and resolution.
+    """
+    denied = await authorize(request, movie_id)
+    if denied:
+        return denied
+
+    playlist_path = (
+        MEDIA_ROOT
+        / "videos"
+        / f"video_{movie_id}"
+        / "processed"
+        / resolution
+        / "index.m3u8"
+    )
+
+    entry = await sync_to_async(lookup_file)(movie_id, resolution, "index.m3u8")
+    if entry is None:
+        return not_found()
+
+    if settings.VIDEO_SIGNED_SEGMENT_URLS:
+        content = await asyncio.to_thread(playlist_path.read_text)
+        return content_response(
+            request,
+            sign_playlist(content, signed_query(movie_id, resolution)),
+            "application/vnd.apple.mpegurl",
+            PLAYLIST_CACHE_CONTROL,
+        )
+
+    return await asyncio.to_thread(
+        media_response,
+        request,
+        playlist_path,
+        "application/vnd.apple.mpegurl",
+        PLAYLIST_CACHE_CONTROL,
+        asynchronous=True,
+        entry=entry,
+    )
+
+
+@require_GET
+async def segment_view(request, movie_id: int, resolution: str, segment: str):
+    """
+    Serve HLS media segments (.ts files or the fMP4 rendition file).
+
+    Signed requests skip authentication and the ready check.
+    """
+    expires = verify_signed_request(request.GET, movie_id, resolution)
+    if expires is None:
+        denied = await authorize(request, movie_id)
+        if denied:
+            return denied
+        cache_control = SEGMENT_CACHE_CONTROL
+    else:
+        cache_control = signed_cache_control(expires)
+
+    content_type = match_content_type(segment, SEGMENT_FILES)
+    segment_path = (
+        MEDIA_ROOT
+        / "videos"
+        / f"video_{movie_id}"
+        / "processed"
+        / resolution
+        / segment
+    )
+
+    entry = await sync_to_async(lookup_file)(movie_id, resolution, segment)
+    if content_type is None or entry is None:
+        return not_found()
+
+    return await asyncio.to_thread(
+        media_response,
+        request,
+        segment_path,
+        content_type,
+        cache_control,
+        asynchronous=True,
+        entry=entry,
+        load_content=partial(cached_segment, segment, segment_path, entry),
+    )
+
+
+async def authorize(request, movie_id: int):
+    """
+    Return an error response unless the request may access the video.
+
+    Runs the configured DRF authentication classes and the ready-video
+    cache lookup in a worker thread, as both may hit the database.
+    Rejected credentials get the same 401 body as from a DRF view.
+    """
+    try:
+        user = await sync_to_async(authenticate)(request)
+    except AuthenticationFailed as exc:
+        return unauthorized(exc.detail)
+
+    if user is None:
+        return unauthorized("Authentication credentials were not provided.")
+
+    if not await sync_to_async(is_video_ready)(movie_id):
+        return not_found()
+
+    return None
+
+
+def authenticate(request):
+    """
+    Return the user authenticated by the first matching DRF authenticator.
+
+    Raises AuthenticationFailed, e.g. for an invalid token or a deleted
+    or inactive user, like DRF's own authentication does.
+    """
+    for authentication_class in api_settings.DEFAULT_AUTHENTICATION_CLASSES:
+        result = authentication_class().authenticate(request)
+        if result is not None:
+            return result[0]
+    return None
+
+
+def unauthorized(detail):
+    """
+    Return the 401 response DRF would send for an authentication error.
+    """
+    data = detail if isinstance(detail, (list, dict)) else {"detail": detail}
+    response = JsonResponse(data, status=401, safe=False)
+    response["WWW-Authenticate"] = 'Bearer realm="api"'
+    return response
+
+
+def not_found():
+    """
+    Return the 404 response DRF would send.
+    """
+    return JsonResponse({"detail": "Not found."}, status=404)
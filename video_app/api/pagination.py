@@ -0,0 +1,105 @@
+"""
+Pagination classes for the video API.
+"""
+
+import base64
+import binascii
+from datetime import datetime
+
+from django.conf import settings
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class VideoCursorPagination(BasePagination):
+    """
+    Opt-in keyset pagination over (created_at, id), newest first.
+
+    Requests without `page_size` or `cursor` get the full, unpaginated
+    list. Pages are taken from `.values()` rows, and each page filters
+    on the last (created_at, id) of the previous one, so the query cost
+    does not grow with the page number and inserts never shift items
+    between pages.
+    """
+
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    invalid_cursor_message = "Invalid cursor."
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if (
+            self.cursor_query_param not in request.query_params
+            and self.page_size_query_param not in request.query_params
+        ):
+            return None
+
+        self.request = request
+        page_size = self.get_page_size(request)
+        queryset = queryset.order_by("-created_at", "-id")
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            created_at, pk = self.decode_cursor(cursor)
+            queryset = queryset.filter(
+                Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+            )
+
+        page = list(queryset[: page_size + 1])
+        self.has_next = len(page) > page_size
+        page = page[:page_size]
+        self.last = page[-1] if page else None
+        return page
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "results": data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        """
+        Return the requested page size, clamped to VIDEO_LIST_MAX_PAGE_SIZE.
+        """
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return settings.VIDEO_LIST_PAGE_SIZE
+        return min(max(page_size, 1), settings.VIDEO_LIST_MAX_PAGE_SIZE)
+
+    def get_next_link(self):
+        """
+        Return the URL of the next page, or None on the last page.
+        """
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        cursor = self.encode_cursor(self.last["created_at"], self.last["id"])
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def encode_cursor(self, created_at, pk):
+        """
+        Return the opaque cursor of a (created_at, id) position.
+        """
+        position = f"{created_at.isoformat()}|{pk}"
+        return base64.urlsafe_b64encode(position.encode()).decode().rstrip("=")
+
+    def decode_cursor(self, cursor):
+        """
+        Return the (created_at, id) position of a cursor.
+        """
+        try:
+            position = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            created_at, pk = position.decode().split("|")
+            return datetime.fromisoformat(created_at), int(pk)
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
@@ -0,0 +1,23 @@
+"""
+Custom permissions for video delivery endpoints.
+"""
+
+from rest_framework.permissions import BasePermission
+
+from video_app.utils.signed_urls import verify_signed_request
+
+
+class HasSegmentSignature(BasePermission):
+    """
+    Allow segment requests carrying a valid, unexpired URL signature.
+    """
+
+    def has_permission(self, request, view):
+        return (
+            verify_signed_request(
+                request.query_params,
+                view.kwargs["movie_id"],
+                view.kwargs["resolution"],
+            )
+            is not None
+        )
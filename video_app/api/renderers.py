@@ -0,0 +1,52 @@
+"""
+Renderers for video API responses.
+"""
+
+import re
+
+import orjson
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+# Floats below 1e-4 or from 1e16 on, which json.dumps writes in exponent
+# notation ("1e+16", "1e-05") and orjson does not ("1e16", "0.00001").
+# Both patterns start with a literal so that the search skips through
+# the body instead of testing every byte; matches inside strings only
+# cost a fallback.
+EXPONENT_FLOAT = re.compile(rb"e-?\d+(?:[,\]}]|\Z)")
+SMALL_FLOAT = re.compile(rb"0\.0000\d*(?:[,\]}]|\Z)")
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer that encodes compact output with orjson.
+
+    The bytes are identical to DRF's compact rendering: datetimes are
+    passed through to DRF's encoder and U+2028 and U+2029 are escaped.
+    Anything orjson rejects or formats differently, such as floats in
+    exponent notation, falls back to the stock renderer, as do indented
+    responses such as those of the browsable API. NaN, which orjson
+    writes as null, does not occur in video listings.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            data is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {})
+            is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            body = orjson.dumps(data, default=JSONEncoder().default, option=ORJSON_OPTIONS)
+        except TypeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        if EXPONENT_FLOAT.search(body) or SMALL_FLOAT.search(body):
+            return super().render(data, accepted_media_type, renderer_context)
+        return body.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+            b"\xe2\x80\xa9", b"\\u2029"
+        )
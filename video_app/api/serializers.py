@@ -2,17 +2,47 @@
 Serializers for video-related API responses.
 """
 
+from operator import itemgetter
+
+from django.urls import reverse
 from rest_framework import serializers
 
 from video_app.models import Video
+from video_app.utils.renditions import get_rendition_ladder, rendition_ladder
+from video_app.utils.thumbnails import THUMBNAIL_NAME, derivative_name
+from video_app.utils.uploads import original_name
+
+# Model columns read by each field of VideoSerializer
+FIELD_COLUMNS = {
+    "id": ("id",),
+    "created_at": ("created_at",),
+    "title": ("title",),
+    "description": ("description",),
+    "thumbnail_url": ("id", "thumbnail", "thumbnail_derivatives"),
+    "thumbnails": ("id", "thumbnail_derivatives"),
+    "category": ("category",),
+    "width": ("width",),
+    "height": ("height",),
+    "duration": ("duration",),
+    "video_codec": ("video_codec",),
+    "audio_codec": ("audio_codec",),
+    "frame_rate": ("frame_rate",),
+    "bitrate": ("bitrate",),
+    "resolutions": ("height",),
+}
 
 
 class VideoSerializer(serializers.ModelSerializer):
     """
     Serializer for video objects used in the video dashboard.
+
+    `fields` limits the output to a subset of the fields; load the
+    instances with `.only(*field_columns(fields))` to skip the others.
     """
 
     thumbnail_url = serializers.SerializerMethodField()
+    thumbnails = serializers.SerializerMethodField()
+    resolutions = serializers.SerializerMethodField()
 
     class Meta:
         model = Video
@@ -22,15 +52,228 @@ class VideoSerializer(serializers.ModelSerializer):
             "title",
             "description",
             "thumbnail_url",
+            "thumbnails",
             "category",
+            "width",
+            "height",
+            "duration",
+            "video_codec",
+            "audio_codec",
+            "frame_rate",
+            "bitrate",
+            "resolutions",
+        ]
+        read_only_fields = [
+            "id",
+            "created_at",
+            "thumbnail_url",
+            "thumbnails",
+            "width",
+            "height",
+            "duration",
+            "video_codec",
+            "audio_codec",
+            "frame_rate",
+            "bitrate",
+            "resolutions",
         ]
-        read_only_fields = ["id", "created_at", "thumbnail_url"]
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
 
     def get_thumbnail_url(self, obj):
         """
-        Return the absolute URL of the video's thumbnail if available.
+        Return the versioned absolute URL of the video's thumbnail if available.
         """
         request = self.context.get("request")
-        if obj.thumbnail and request:
-            return request.build_absolute_uri(obj.thumbnail.url)
-        return None
+        if not obj.thumbnail or not request:
+            return None
+
+        version = (obj.thumbnail_derivatives or {}).get("version", "")
+        return request.build_absolute_uri(
+            reverse("video-thumbnail", args=[obj.id, THUMBNAIL_NAME])
+            + f"?v={version}"
+        )
+
+    def get_thumbnails(self, obj):
+        """
+        Return a srcset string per image format of the thumbnail derivatives.
+        """
+        request = self.context.get("request")
+        derivatives = obj.thumbnail_derivatives or {}
+        if not request or not derivatives:
+            return {}
+
+        version = derivatives.get("version", "")
+        srcsets = {}
+        for image_format, widths in derivatives.items():
+            if image_format == "version":
+                continue
+            srcsets[image_format] = ", ".join(
+                "{} {}w".format(
+                    request.build_absolute_uri(
+                        reverse(
+                            "video-thumbnail",
+                            args=[obj.id, derivative_name(width, image_format)],
+                        )
+                        + f"?v={version}"
+                    ),
+                    width,
+                )
+                for width in widths
+            )
+        return srcsets
+
+    def get_resolutions(self, obj):
+        """
+        Return the HLS resolutions generated for the video.
+        """
+        return [f"{resolution}p" for resolution in get_rendition_ladder(obj)]
+
+
+class VideoListingSerializer:
+    """
+    Fast-path equivalent of VideoSerializer for video listings.
+
+    Works on `.values()` rows of `columns` instead of model instances.
+    The absolute thumbnail URL template and the
+    rendition ladder per source height are computed once per request
+    instead of once per row. The output is identical to VideoSerializer.
+
+    `fields` limits the output to a subset of VideoSerializer's fields,
+    and `columns` to the columns they read plus `required_columns`.
+    """
+
+    # Arguments reversed into the thumbnail URL template
+    ID_PLACEHOLDER = 9081726354
+    NAME_PLACEHOLDER = "thumbnail-name-placeholder"
+
+    def __init__(self, request, fields=None, required_columns=()):
+        self.thumbnail_template = (
+            request.build_absolute_uri(
+                reverse(
+                    "video-thumbnail",
+                    args=[self.ID_PLACEHOLDER, self.NAME_PLACEHOLDER],
+                )
+            )
+            .replace(str(self.ID_PLACEHOLDER), "{id}")
+            .replace(self.NAME_PLACEHOLDER, "{name}")
+        )
+        self.datetime_field = serializers.DateTimeField()
+        self.ladders = {}
+
+        # Getters in the order of VideoSerializer.Meta.fields
+        fields = VideoSerializer.Meta.fields if fields is None else fields
+        self.getters = [
+            (name, getattr(self, f"get_{name}", None) or itemgetter(name))
+            for name in VideoSerializer.Meta.fields
+            if name in fields
+        ]
+        self.columns = field_columns(
+            [name for name, _ in self.getters], required_columns
+        )
+
+    def serialize(self, rows):
+        """
+        Return the representations of an iterable of rows.
+        """
+        return [self.to_representation(row) for row in rows]
+
+    def to_representation(self, row):
+        return {name: getter(row) for name, getter in self.getters}
+
+    def get_created_at(self, row):
+        """
+        Return the creation date in DRF's datetime format.
+        """
+        return self.datetime_field.to_representation(row["created_at"])
+
+    def get_thumbnail_url(self, row):
+        """
+        Return the versioned absolute URL of the thumbnail if available.
+        """
+        if not row["thumbnail"]:
+            return None
+
+        version = (row["thumbnail_derivatives"] or {}).get("version", "")
+        return "{}?v={}".format(
+            self.thumbnail_template.format(id=row["id"], name=THUMBNAIL_NAME),
+            version,
+        )
+
+    def get_thumbnails(self, row):
+        """
+        Return a srcset string per image format of the thumbnail derivatives.
+        """
+        derivatives = row["thumbnail_derivatives"] or {}
+        if not derivatives:
+            return {}
+
+        version = derivatives.get("version", "")
+        return {
+            image_format: ", ".join(
+                "{}?v={} {}w".format(
+                    self.thumbnail_template.format(
+                        id=row["id"], name=derivative_name(width, image_format)
+                    ),
+                    version,
+                    width,
+                )
+                for width in widths
+            )
+            for image_format, widths in derivatives.items()
+            if image_format != "version"
+        }
+
+    def get_resolutions(self, row):
+        """
+        Return the HLS resolutions generated for the video.
+        """
+        height = row["height"]
+        if height not in self.ladders:
+            self.ladders[height] = [
+                f"{resolution}p" for resolution in rendition_ladder(height)
+            ]
+        return self.ladders[height]
+
+
+class VideoUploadSerializer(serializers.ModelSerializer):
+    """
+    Serializer starting a chunked upload of a new video.
+    """
+
+    filename = serializers.CharField(write_only=True, max_length=200)
+    upload_size = serializers.IntegerField(min_value=1)
+
+    class Meta:
+        model = Video
+        fields = [
+            "id",
+            "title",
+            "description",
+            "category",
+            "filename",
+            "upload_size",
+        ]
+        read_only_fields = ["id"]
+
+    def create(self, validated_data):
+        filename = validated_data.pop("filename")
+
+        video = Video.objects.create(status="uploading", **validated_data)
+        video.original_file.name = original_name(video.id, filename)
+        video.save(update_fields=["original_file"])
+        return video
+
+
+def field_columns(fields, required_columns=()):
+    """
+    Return the model columns read by serializing `fields`, without duplicates.
+    """
+    columns = dict.fromkeys(required_columns)
+    for name in fields:
+        columns.update(dict.fromkeys(FIELD_COLUMNS[name]))
+    return tuple(columns)
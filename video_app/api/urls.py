@@ -2,28 +2,100 @@
 URL configuration for video-related API endpoints.
 """
 
+from django.conf import settings
 from django.urls import path
 
+from .async_views import master_playlist_view, playlist_view, segment_view
 from .views import (
+    VideoDashboardAPIView,
     VideoListAPIView,
+    VideoMasterPlaylistAPIView,
     VideoPlaylistAPIView,
+    VideoProgressAPIView,
+    VideoReadyCacheStatsAPIView,
+    VideoSearchAPIView,
     VideoSegmentAPIView,
+    VideoSegmentCacheStatsAPIView,
+    VideoThumbnailAPIView,
+    VideoTrickplayAPIView,
+    VideoUploadAPIView,
+    VideoUploadChunkAPIView,
 )
 
+# Playlists and segments are served by async views under ASGI if enabled
+if settings.VIDEO_ASYNC_DELIVERY:
+    master_playlist = master_playlist_view
+    rendition_playlist = playlist_view
+    media_segment = segment_view
+else:
+    master_playlist = VideoMasterPlaylistAPIView.as_view()
+    rendition_playlist = VideoPlaylistAPIView.as_view()
+    media_segment = VideoSegmentAPIView.as_view()
+
 urlpatterns = [
     path(
         "video/",
         VideoListAPIView.as_view(),
         name="video-list",
     ),
+    path(
+        "video/search/",
+        VideoSearchAPIView.as_view(),
+        name="video-search",
+    ),
+    path(
+        "video/dashboard/",
+        VideoDashboardAPIView.as_view(),
+        name="video-dashboard",
+    ),
+    path(
+        "video/upload/",
+        VideoUploadAPIView.as_view(),
+        name="video-upload",
+    ),
+    path(
+        "video/upload/<int:movie_id>/",
+        VideoUploadChunkAPIView.as_view(),
+        name="video-upload-chunk",
+    ),
+    path(
+        "video/ready-cache-stats/",
+        VideoReadyCacheStatsAPIView.as_view(),
+        name="video-ready-cache-stats",
+    ),
+    path(
+        "video/segment-cache-stats/",
+        VideoSegmentCacheStatsAPIView.as_view(),
+        name="video-segment-cache-stats",
+    ),
+    path(
+        "video/<int:movie_id>/progress/",
+        VideoProgressAPIView.as_view(),
+        name="video-progress",
+    ),
+    path(
+        "video/<int:movie_id>/master.m3u8",
+        master_playlist,
+        name="video-master-playlist",
+    ),
+    path(
+        "video/<int:movie_id>/thumbnail/<str:filename>",
+        VideoThumbnailAPIView.as_view(),
+        name="video-thumbnail",
+    ),
+    path(
+        "video/<int:movie_id>/trickplay/<str:filename>",
+        VideoTrickplayAPIView.as_view(),
+        name="video-trickplay",
+    ),
     path(
         "video/<int:movie_id>/<str:resolution>/index.m3u8",
-        VideoPlaylistAPIView.as_view(),
+        rendition_playlist,
         name="video-playlist",
     ),
     path(
         "video/<int:movie_id>/<str:resolution>/<str:segment>/",
-        VideoSegmentAPIView.as_view(),
+        media_segment,
         name="video-segment",
     ),
 ]
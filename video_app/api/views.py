@@ -2,37 +2,392 @@
 API views for video listing and HLS video delivery.
 """
 
+import re
+import time
+from functools import partial
 from pathlib import Path
 
 from django.conf import settings
-from django.http import FileResponse
+from django.db import transaction
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from rest_framework import generics, status
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
+from rest_framework.renderers import BrowsableAPIRenderer
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from video_app.models import Video
-from .serializers import VideoSerializer
+from video_app.tasks import enqueue_video_conversion
+from video_app.utils.delivery import content_response, media_response
+from video_app.utils.list_cache import cached_list
+from video_app.utils.manifest_index import ROOT_KEY, lookup_file
+from video_app.utils.progress import get_progress
+from video_app.utils.ready_cache import get_stats, is_video_ready
+from video_app.utils.search import search_videos
+from video_app.utils.segment_cache import (
+    cached_segment,
+    get_stats as get_segment_cache_stats,
+)
+from video_app.utils.signed_urls import (
+    sign_playlist,
+    signed_query,
+    verify_signed_request,
+)
+from video_app.utils.uploads import append_chunk, current_offset
+from .pagination import VideoCursorPagination
+from .permissions import HasSegmentSignature
+from .renderers import FastJSONRenderer
+from .serializers import (
+    VideoListingSerializer,
+    VideoSerializer,
+    VideoUploadSerializer,
+)
 
 MEDIA_ROOT = Path(settings.MEDIA_ROOT)
 
+# Media files of a rendition: numbered MPEG-TS segments, or the single
+# fMP4 file whose segments the playlist addresses by byte range
+SEGMENT_FILES = {
+    re.compile(r"index\d+\.ts"): "video/MP2T",
+    re.compile(r"index\.m4s"): "video/mp4",
+}
+
+# Files a trickplay request may ask for, mapped to their content type
+TRICKPLAY_FILES = {
+    re.compile(r"index\.vtt"): "text/vtt",
+    re.compile(r"sprite_\d+\.jpg"): "image/jpeg",
+}
+
+# Thumbnail files and derivatives, mapped to their content type
+THUMBNAIL_FILES = {
+    re.compile(r"thumbnail\.jpg"): "image/jpeg",
+    re.compile(r"thumbnail_\d+\.webp"): "image/webp",
+    re.compile(r"thumbnail_\d+\.avif"): "image/avif",
+}
+
+# Thumbnail URLs carry a version token, so they can be cached for a year
+THUMBNAIL_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Segments of a ready video never change. They are only served to
+# authenticated users, so shared caches must not store them.
+SEGMENT_CACHE_CONTROL = "private, max-age=31536000, immutable"
+
+# The video list is cached server-side and revalidated on every load,
+# which the ETag turns into a cheap 304 until a video changes
+LIST_CACHE_CONTROL = "private, no-cache"
+
+# Playlists and trickplay files are revalidated after a short TTL,
+# which the ETag turns into a cheap 304
+PLAYLIST_CACHE_CONTROL = "private, max-age=60"
+
 
 class VideoListAPIView(generics.ListAPIView):
     """
     List all ready-to-play videos ordered by creation date.
+
+    Clients passing `page_size` or `cursor` get keyset-paginated pages
+    with a `next` link; without them the full list is returned.
+
+    `fields` selects a comma-separated subset of VideoSerializer's
+    fields; the columns of the others are not loaded.
+
+    Rendered responses are cached in Redis per URL and served with an
+    ETag until a video is saved or deleted. Misses are serialized from
+    `.values()` rows by VideoListingSerializer.
+    """
+
+    queryset = Video.objects.filter(status="ready").order_by("-created_at", "-id")
+    serializer_class = VideoSerializer
+    pagination_class = VideoCursorPagination
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
+
+    def list(self, request, *args, **kwargs):
+        fields = get_fields(request)
+        if not settings.VIDEO_LIST_CACHE_TIMEOUT:
+            return Response(
+                self.get_listing(request, fields), status=status.HTTP_200_OK
+            )
+
+        body, etag = cached_list(
+            request,
+            lambda: FastJSONRenderer().render(self.get_listing(request, fields)),
+        )
+        return content_response(
+            request, body, "application/json", LIST_CACHE_CONTROL, etag
+        )
+
+    def get_listing(self, request, fields):
+        """
+        Return the serialized list, or the requested page of it.
+        """
+        # The pagination keyset is read even if the fields omit it
+        serializer = VideoListingSerializer(
+            request, fields, required_columns=("created_at", "id")
+        )
+        rows = self.get_queryset().values(*serializer.columns)
+
+        page = self.paginate_queryset(rows)
+        if page is None:
+            return serializer.serialize(rows)
+        return self.get_paginated_response(serializer.serialize(page)).data
+
+
+class VideoSearchAPIView(generics.ListAPIView):
+    """
+    Search ready videos by title, description and category.
+
+    Every word of `q` is matched as a prefix through the GIN-indexed
+    search vector, and results are ordered by rank. At most
+    VIDEO_SEARCH_LIMIT videos are returned. `fields` works as for the
+    video list.
     """
 
-    queryset = Video.objects.filter(status="ready").order_by("-created_at")
     serializer_class = VideoSerializer
+    pagination_class = None
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
+
+    def get_queryset(self):
+        videos = Video.objects.filter(status="ready")
+        query = self.request.query_params.get("q", "")
+        return search_videos(videos, query)[: settings.VIDEO_SEARCH_LIMIT]
+
+    def list(self, request, *args, **kwargs):
+        serializer = VideoListingSerializer(request, get_fields(request))
+        rows = self.get_queryset().values(*serializer.columns)
+        return Response(serializer.serialize(rows), status=status.HTTP_200_OK)
+
+
+class VideoDashboardAPIView(APIView):
+    """
+    List the newest ready videos of every category for the dashboard rows.
+
+    The rows are selected by one query that numbers the videos of each
+    category with a window function, instead of one query per category.
+    `per_category` sets the row size and `fields` the fields of each
+    video, as for the video list. Responses are cached like the video
+    list.
+    """
+
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
+
+    def get(self, request, *args, **kwargs):
+        fields = get_fields(request)
+        if not settings.VIDEO_LIST_CACHE_TIMEOUT:
+            return Response(self.get_rows(request, fields), status=status.HTTP_200_OK)
+
+        body, etag = cached_list(
+            request, lambda: FastJSONRenderer().render(self.get_rows(request, fields))
+        )
+        return content_response(
+            request, body, "application/json", LIST_CACHE_CONTROL, etag
+        )
+
+    def get_rows(self, request, fields):
+        """
+        Return one row per category that has ready videos, in genre order.
+        """
+        row_size = get_row_size(request)
+        serializer = VideoListingSerializer(
+            request, fields, required_columns=("category",)
+        )
+        videos = (
+            Video.objects.filter(status="ready")
+            .annotate(
+                row_number=Window(
+                    RowNumber(),
+                    partition_by=F("category"),
+                    order_by=[F("created_at").desc(), F("id").desc()],
+                )
+            )
+            .filter(row_number__lte=row_size)
+            .order_by("category", "row_number")
+            .values(*serializer.columns)
+        )
+
+        grouped = {}
+        for video in videos:
+            grouped.setdefault(video["category"], []).append(
+                serializer.to_representation(video)
+            )
+
+        return [
+            {"category": category, "label": label, "videos": grouped[category]}
+            for category, label in Video.CATEGORY_CHOICES
+            if category in grouped
+        ]
+
+
+class VideoUploadAPIView(APIView):
+    """
+    Start a chunked, resumable upload of a new video.
+    """
+
+    permission_classes = [IsAdminUser]
+
+    def post(self, request, *args, **kwargs):
+        serializer = VideoUploadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+
+        return Response(
+            {**serializer.data, "offset": 0},
+            status=status.HTTP_201_CREATED,
+        )
+
+
+class VideoUploadChunkAPIView(APIView):
+    """
+    Report the offset of an upload and append chunks to it.
+
+    Chunks are sent as raw request bodies with an `Upload-Offset`
+    header and are streamed straight into the final original directory.
+    """
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, movie_id: int, *args, **kwargs):
+        video = get_object_or_404(Video, id=movie_id)
+
+        return Response(
+            {
+                "id": video.id,
+                "status": video.status,
+                "offset": current_offset(video),
+                "upload_size": video.upload_size,
+                "content_hash": video.content_hash,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+    def patch(self, request, movie_id: int, *args, **kwargs):
+        video = get_object_or_404(Video, id=movie_id, status="uploading")
+
+        try:
+            offset = int(request.headers["Upload-Offset"])
+            length = int(request.META.get("CONTENT_LENGTH") or 0)
+        except (KeyError, ValueError):
+            return Response(
+                {"detail": "A valid Upload-Offset header is required."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if offset + length > video.upload_size:
+            return Response(
+                {"detail": "Chunk exceeds the announced upload size."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        new_offset = append_chunk(video, request.stream, offset, length)
+
+        if new_offset is None:
+            return Response(
+                {
+                    "detail": "Upload offset mismatch.",
+                    "offset": current_offset(video),
+                },
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        if new_offset == video.upload_size:
+            video.status = "pending"
+            video.save(update_fields=["status"])
+            transaction.on_commit(lambda: enqueue_video_conversion(video.id))
+
+        return Response(
+            {
+                "id": video.id,
+                "status": video.status,
+                "offset": new_offset,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+class VideoProgressAPIView(APIView):
+    """
+    Return the processing status and per-stage progress of a video.
+
+    Progress is read from Redis only, so polling is cheap.
+    """
+
+    def get(self, request, movie_id: int, *args, **kwargs):
+        video = get_object_or_404(Video.objects.only("status"), id=movie_id)
+
+        return Response(
+            {
+                "id": movie_id,
+                "status": video.status,
+                "stages": get_progress(movie_id),
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+class VideoReadyCacheStatsAPIView(APIView):
+    """
+    Return the hit ratio of the ready-video cache across all processes.
+    """
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        return Response(get_stats(), status=status.HTTP_200_OK)
+
+
+class VideoSegmentCacheStatsAPIView(APIView):
+    """
+    Return hit, admission and eviction counters of the hot segment cache.
+    """
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        return Response(get_segment_cache_stats(), status=status.HTTP_200_OK)
+
+
+class VideoMasterPlaylistAPIView(APIView):
+    """
+    Serve the HLS master playlist (master.m3u8) listing every resolution.
+    """
+
+    def get(self, request, movie_id: int, *args, **kwargs):
+        ensure_video_ready(movie_id)
+
+        master_path = (
+            MEDIA_ROOT
+            / "videos"
+            / f"video_{movie_id}"
+            / "processed"
+            / "master.m3u8"
+        )
+
+        entry = lookup_file(movie_id, ROOT_KEY, "master.m3u8")
+        if entry is None:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+
+        return media_response(
+            request,
+            master_path,
+            "application/vnd.apple.mpegurl",
+            PLAYLIST_CACHE_CONTROL,
+            entry=entry,
+        )
 
 
 class VideoPlaylistAPIView(APIView):
     """
     Serve the HLS playlist (index.m3u8) for a given video and resolution.
+
+    With VIDEO_SIGNED_SEGMENT_URLS every segment URI is rewritten to
+    carry an expiring signature for this rendition.
     """
 
     def get(self, request, movie_id: int, resolution: str, *args, **kwargs):
-        get_ready_video(movie_id)
+        ensure_video_ready(movie_id)
 
         playlist_path = (
             MEDIA_ROOT
@@ -43,23 +398,62 @@ class VideoPlaylistAPIView(APIView):
             / "index.m3u8"
         )
 
-        if not playlist_path.exists():
+        entry = lookup_file(movie_id, resolution, "index.m3u8")
+        if entry is None:
             return Response(status=status.HTTP_404_NOT_FOUND)
 
-        return FileResponse(
-            playlist_path.open("rb"),
-            content_type="application/vnd.apple.mpegurl",
+        if settings.VIDEO_SIGNED_SEGMENT_URLS:
+            return content_response(
+                request,
+                sign_playlist(
+                    playlist_path.read_text(), signed_query(movie_id, resolution)
+                ),
+                "application/vnd.apple.mpegurl",
+                PLAYLIST_CACHE_CONTROL,
+            )
+
+        return media_response(
+            request,
+            playlist_path,
+            "application/vnd.apple.mpegurl",
+            PLAYLIST_CACHE_CONTROL,
+            entry=entry,
         )
 
 
 class VideoSegmentAPIView(APIView):
     """
-    Serve individual HLS video segments (.ts files).
+    Serve HLS media segments (.ts files or the fMP4 rendition file).
+
+    Range requests are answered with 206 Partial Content, which players
+    use to fetch the byte-range segments of fMP4 renditions. Segments
+    are marked immutable and revalidated by ETag. Names are resolved
+    against the video's manifest index, so unknown files are rejected
+    without touching the filesystem. Hot segments admitted to the
+    segment cache are served from memory.
+
+    Requests with a valid URL signature from the playlist are served
+    without authenticating the user or checking the database, and may
+    be cached by shared proxies until the signature expires. Unsigned
+    requests fall back to JWT authentication.
     """
 
+    permission_classes = [HasSegmentSignature | IsAuthenticated]
+
+    def perform_authentication(self, request):
+        """
+        Authenticate lazily, so signed requests never decode a JWT.
+        """
+
     def get(self, request, movie_id: int, resolution: str, segment: str, *args, **kwargs):
-        get_ready_video(movie_id)
+        expires = verify_signed_request(request.query_params, movie_id, resolution)
+        if expires is None:
+            ensure_video_ready(movie_id)
+            cache_control = SEGMENT_CACHE_CONTROL
+        else:
+            cache_control = signed_cache_control(expires)
 
+        content_type = match_content_type(segment, SEGMENT_FILES)
         segment_path = (
             MEDIA_ROOT
             / "videos"
@@ -69,17 +463,136 @@ class VideoSegmentAPIView(APIView):
             / segment
         )
 
-        if not segment_path.exists():
+        entry = lookup_file(movie_id, resolution, segment)
+        if content_type is None or entry is None:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+
+        return media_response(
+            request,
+            segment_path,
+            content_type,
+            cache_control,
+            entry=entry,
+            load_content=partial(cached_segment, segment, segment_path, entry),
+        )
+
+
+class VideoTrickplayAPIView(APIView):
+    """
+    Serve the WebVTT index and sprite sheets used for seek previews.
+    """
+
+    def get(self, request, movie_id: int, filename: str, *args, **kwargs):
+        ensure_video_ready(movie_id)
+
+        content_type = match_content_type(filename, TRICKPLAY_FILES)
+        trickplay_path = (
+            MEDIA_ROOT / "videos" / f"video_{movie_id}" / "trickplay" / filename
+        )
+
+        if content_type is None or not trickplay_path.exists():
             return Response(status=status.HTTP_404_NOT_FOUND)
 
-        return FileResponse(
-            segment_path.open("rb"),
-            content_type="video/MP2T",
+        return media_response(
+            request, trickplay_path, content_type, PLAYLIST_CACHE_CONTROL
+        )
+
+
+class VideoThumbnailAPIView(APIView):
+    """
+    Serve the thumbnail and its responsive derivatives.
+
+    Responses are publicly cacheable for a year, the serializer adds a
+    version token to every URL so regenerated images get new URLs.
+    """
+
+    # Thumbnails are public like the media files they replace. Skipping
+    # authentication keeps responses identical for every client, so
+    # shared caches can store them, and `<img>` tags need no bearer token.
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def get(self, request, movie_id: int, filename: str, *args, **kwargs):
+        ensure_video_ready(movie_id)
+
+        content_type = match_content_type(filename, THUMBNAIL_FILES)
+        thumbnail_path = (
+            MEDIA_ROOT / "videos" / f"video_{movie_id}" / "thumbnails" / filename
+        )
+
+        if content_type is None or not thumbnail_path.exists():
+            return Response(status=status.HTTP_404_NOT_FOUND)
+
+        return media_response(
+            request, thumbnail_path, content_type, THUMBNAIL_CACHE_CONTROL
+        )
+
+
+def get_row_size(request):
+    """
+    Return the requested dashboard row size, clamped to
+    VIDEO_LIST_MAX_PAGE_SIZE.
+    """
+    try:
+        row_size = int(request.query_params["per_category"])
+    except (KeyError, ValueError):
+        return settings.VIDEO_DASHBOARD_ROW_SIZE
+    return min(max(row_size, 1), settings.VIDEO_LIST_MAX_PAGE_SIZE)
+
+
+def get_fields(request):
+    """
+    Return the video fields selected by `fields`, or None if it is absent.
+
+    Raises ValidationError for names outside VideoSerializer's fields.
+    """
+    if "fields" not in request.query_params:
+        return None
+
+    fields = [
+        name.strip()
+        for name in request.query_params["fields"].split(",")
+        if name.strip()
+    ]
+    if not fields:
+        raise ValidationError({"fields": "Select at least one field."})
+
+    unknown = [name for name in fields if name not in VideoSerializer.Meta.fields]
+    if unknown:
+        raise ValidationError(
+            {
+                "fields": "Unknown fields: {}. Allowed fields: {}.".format(
+                    ", ".join(unknown), ", ".join(VideoSerializer.Meta.fields)
+                )
+            }
         )
+    return fields
 
 
-def get_ready_video(movie_id: int):
+def signed_cache_control(expires: int):
     """
-    Return a ready video object or raise 404 if not found or not ready.
+    Return the Cache-Control of a signed segment valid until `expires`.
+    """
+    max_age = max(expires - int(time.time()), 0)
+    return f"public, max-age={max_age}, immutable"
+
+
+def match_content_type(filename: str, allowed_files: dict):
+    """
+    Return the content type of an allowed file name, or None.
+    """
+    for pattern, content_type in allowed_files.items():
+        if pattern.fullmatch(filename):
+            return content_type
+    return None
+
+
+def ensure_video_ready(movie_id: int):
+    """
+    Raise 404 unless the video exists and is ready to play.
+
+    Readiness is read from the two-tier ready-video cache, so playlist
+    and segment requests do not query the database.
     """
-    return get_object_or_404(Video, id=movie_id, status="ready")
+    if not is_video_ready(movie_id):
+        raise Http404("Video not found.")
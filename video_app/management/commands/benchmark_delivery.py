@@ -0,0 +1,306 @@
+"""
+Management command to benchmark segment delivery under WSGI and ASGI.
+
+Starts the project once per server profile (gunicorn sync workers with
+the DRF views, uvicorn with the async delivery views), simulates
+concurrent viewers that download a segment at a limited bitrate and
+reports throughput, latency and server memory per open connection.
+"""
+
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+
+from video_app.utils.signed_urls import signed_query
+
+# Commands of the deployment profiles, see backend.entrypoint.sh
+SERVER_COMMANDS = {
+    "wsgi": [
+        "gunicorn",
+        "core.wsgi:application",
+        "--bind",
+        "127.0.0.1:{port}",
+        "--workers",
+        "{workers}",
+        "--timeout",
+        "300",
+    ],
+    "asgi": [
+        "uvicorn",
+        "core.asgi:application",
+        "--host",
+        "127.0.0.1",
+        "--port",
+        "{port}",
+        "--workers",
+        "{workers}",
+    ],
+}
+
+# Bytes a simulated viewer reads per step of its download loop
+READ_BLOCK_SIZE = 64 * 1024
+
+
+class Command(BaseCommand):
+    help = "Compare concurrent-viewer capacity of WSGI and ASGI segment delivery."
+
+    def add_arguments(self, parser):
+        parser.add_argument("video_id", type=int, help="Id of a ready video.")
+        parser.add_argument(
+            "--resolution", default="480p", help="Rendition to download from."
+        )
+        parser.add_argument(
+            "--segment",
+            default="index0.ts",
+            help="Segment file name, e.g. index0.ts or index.m4s.",
+        )
+        parser.add_argument(
+            "--profiles",
+            default="wsgi,asgi",
+            help="Comma-separated server profiles to benchmark.",
+        )
+        parser.add_argument(
+            "--concurrency",
+            default="10,50,200",
+            help="Comma-separated numbers of simultaneous viewers.",
+        )
+        parser.add_argument(
+            "--duration",
+            type=int,
+            default=15,
+            help="Seconds each concurrency level runs.",
+        )
+        parser.add_argument(
+            "--viewer-kbps",
+            type=int,
+            default=4000,
+            help="Download bitrate of a single viewer in kbit/s (0 = unlimited).",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Server worker processes per profile.",
+        )
+        parser.add_argument("--port", type=int, default=0, help="Server port.")
+
+    def handle(self, *args, **options):
+        path = (
+            reverse(
+                "video-segment",
+                args=[options["video_id"], options["resolution"], options["segment"]],
+            )
+            + "?"
+            + signed_query(options["video_id"], options["resolution"])
+        )
+        levels = [int(level) for level in options["concurrency"].split(",")]
+
+        for profile in options["profiles"].split(","):
+            if profile not in SERVER_COMMANDS:
+                raise CommandError(f"Unknown profile '{profile}'.")
+
+            port = options["port"] or free_port()
+            server = start_server(profile, port, options["workers"])
+            try:
+                wait_for_port(port)
+                idle_rss = process_tree_rss(server.pid)
+                self.stdout.write(
+                    f"{profile}: idle RSS {idle_rss / 2**20:.1f} MiB"
+                )
+                for level in levels:
+                    result = asyncio.run(
+                        run_level(
+                            port,
+                            path,
+                            level,
+                            options["duration"],
+                            options["viewer_kbps"],
+                            server.pid,
+                        )
+                    )
+                    self.report(profile, level, result, idle_rss)
+            finally:
+                server.terminate()
+                server.wait(timeout=30)
+
+    def report(self, profile, level, result, idle_rss):
+        """
+        Write one result line of a concurrency level.
+        """
+        latencies = result["first_byte"] or [0.0]
+        per_connection = max(result["peak_rss"] - idle_rss, 0) / level
+        self.stdout.write(
+            f"{profile:<5} {level:>5} viewers: "
+            f"{result['requests'] / result['elapsed']:8.1f} req/s  "
+            f"{result['bytes'] * 8 / result['elapsed'] / 1e6:8.1f} Mbit/s  "
+            f"ttfb p50 {statistics.median(latencies) * 1000:7.1f} ms  "
+            f"p95 {percentile(latencies, 95) * 1000:7.1f} ms  "
+            f"errors {result['errors']:>5}  "
+            f"peak RSS {result['peak_rss'] / 2**20:7.1f} MiB  "
+            f"{per_connection / 1024:7.1f} KiB/connection"
+        )
+
+
+def start_server(profile, port, workers):
+    """
+    Start the project with the commands of a deployment profile.
+    """
+    cmd = [
+        part.format(port=port, workers=workers) for part in SERVER_COMMANDS[profile]
+    ]
+    env = {
+        **os.environ,
+        "VIDEO_ASYNC_DELIVERY": "True" if profile == "asgi" else "False",
+    }
+    try:
+        return subprocess.Popen(
+            cmd,
+            cwd=Path(settings.BASE_DIR),
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+    except FileNotFoundError:
+        raise CommandError(f"'{cmd[0]}' is not installed.")
+
+
+async def run_level(port, path, viewers, duration, viewer_kbps, server_pid):
+    """
+    Run `viewers` concurrent download loops for `duration` seconds.
+    """
+    result = {"requests": 0, "bytes": 0, "errors": 0, "first_byte": [], "peak_rss": 0}
+    deadline = time.monotonic() + duration
+    started = time.monotonic()
+
+    async def sample_memory():
+        while time.monotonic() < deadline:
+            result["peak_rss"] = max(
+                result["peak_rss"], process_tree_rss(server_pid)
+            )
+            await asyncio.sleep(0.5)
+
+    await asyncio.gather(
+        sample_memory(),
+        *(
+            viewer_loop(port, path, deadline, viewer_kbps, result)
+            for _ in range(viewers)
+        ),
+    )
+    result["elapsed"] = time.monotonic() - started
+    return result
+
+
+async def viewer_loop(port, path, deadline, viewer_kbps, result):
+    """
+    Download the segment again and again at the viewer's bitrate.
+    """
+    while time.monotonic() < deadline:
+        try:
+            first_byte, size = await download(port, path, viewer_kbps, deadline)
+        except (OSError, ValueError, asyncio.IncompleteReadError):
+            result["errors"] += 1
+            await asyncio.sleep(0.1)
+            continue
+        result["requests"] += 1
+        result["bytes"] += size
+        result["first_byte"].append(first_byte)
+
+
+async def download(port, path, viewer_kbps, deadline):
+    """
+    Fetch a path over a fresh connection, throttled to `viewer_kbps`.
+
+    Returns the time to the response headers and the body size.
+    """
+    started = time.monotonic()
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        writer.write(
+            f"GET {path} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n".encode()
+        )
+        await writer.drain()
+
+        status_line = await reader.readline()
+        if b" 200 " not in status_line:
+            raise ValueError(status_line.decode(errors="replace").strip())
+        await reader.readuntil(b"\r\n\r\n")
+        first_byte = time.monotonic() - started
+
+        size = 0
+        while time.monotonic() < deadline:
+            block = await reader.read(READ_BLOCK_SIZE)
+            if not block:
+                break
+            size += len(block)
+            if viewer_kbps:
+                await asyncio.sleep(len(block) * 8 / (viewer_kbps * 1000))
+        return first_byte, size
+    finally:
+        writer.close()
+
+
+def process_tree_rss(pid):
+    """
+    Return the resident memory in bytes of a process and its children.
+    """
+    children = {}
+    for stat_path in Path("/proc").glob("[0-9]*/stat"):
+        try:
+            fields = stat_path.read_text().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        children.setdefault(int(fields[1]), []).append(int(stat_path.parent.name))
+
+    total = 0
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        pending.extend(children.get(current, []))
+        try:
+            status = Path(f"/proc/{current}/status").read_text()
+        except OSError:
+            continue
+        for line in status.splitlines():
+            if line.startswith("VmRSS:"):
+                total += int(line.split()[1]) * 1024
+    return total
+
+
+def percentile(values, percent):
+    """
+    Return the given percentile of a list of numbers.
+    """
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, round(percent / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+def free_port():
+    """
+    Return a free TCP port on the loopback interface.
+    """
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port, timeout=30):
+    """
+    Wait until the server accepts connections.
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise CommandError(f"Server did not start on port {port}.")
@@ -0,0 +1,149 @@
+"""
+Management command to benchmark the video listing serializers.
+
+Renders the same videos with VideoSerializer and the stock JSON
+renderer, and with the `.values()` fast path (VideoListingSerializer
+and FastJSONRenderer), checks that both produce identical bytes and
+reports the time per rendering. Synthetic in-memory videos are used
+unless --from-db is given, in which case the query is timed as well.
+"""
+
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from video_app.api.renderers import FastJSONRenderer
+from video_app.api.serializers import VideoListingSerializer, VideoSerializer
+from video_app.models import Video
+
+
+class Command(BaseCommand):
+    help = "Compare VideoSerializer with the fast listing path."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rows", type=int, default=10000, help="Number of videos to render."
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=5, help="Runs per path; the best is kept."
+        )
+        parser.add_argument(
+            "--from-db",
+            action="store_true",
+            help="Render ready videos from the database, including the query.",
+        )
+        parser.add_argument(
+            "--host",
+            default="localhost",
+            help="Host of the simulated request (must be in ALLOWED_HOSTS).",
+        )
+
+    def handle(self, *args, **options):
+        request = RequestFactory().get("/api/video/", HTTP_HOST=options["host"])
+        columns = VideoListingSerializer(request).columns
+        rows = options["rows"]
+
+        if options["from_db"]:
+            queryset = Video.objects.filter(status="ready").order_by(
+                "-created_at", "-id"
+            )[:rows]
+
+            def load_videos():
+                return list(queryset)
+
+            def load_rows():
+                return list(queryset.values(*columns))
+
+        else:
+            videos = synthetic_videos(rows)
+            values = [video_values(video, columns) for video in videos]
+
+            def load_videos():
+                return videos
+
+            def load_rows():
+                return values
+
+        def render_serializer():
+            return JSONRenderer().render(
+                VideoSerializer(
+                    load_videos(), many=True, context={"request": request}
+                ).data
+            )
+
+        def render_fast_path():
+            return FastJSONRenderer().render(
+                VideoListingSerializer(request).serialize(load_rows())
+            )
+
+        expected, serializer_time = best_of(render_serializer, options["repeat"])
+        actual, fast_time = best_of(render_fast_path, options["repeat"])
+        if actual != expected:
+            raise CommandError("The fast path output differs from VideoSerializer.")
+
+        self.stdout.write(
+            f"{len(load_rows())} videos, {len(expected) / 2**20:.1f} MiB of JSON, "
+            "output identical"
+        )
+        self.stdout.write(f"VideoSerializer  {serializer_time * 1000:9.1f} ms")
+        self.stdout.write(f"fast path        {fast_time * 1000:9.1f} ms")
+        self.stdout.write(f"speedup          {serializer_time / fast_time:9.1f}x")
+
+
+def best_of(render, repeat):
+    """
+    Return the output and the shortest wall time of `repeat` renderings.
+    """
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        output = render()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return output, best
+
+
+def synthetic_videos(count):
+    """
+    Return unsaved videos resembling a published catalogue.
+    """
+    now = timezone.now()
+    categories = [category for category, _ in Video.CATEGORY_CHOICES]
+    heights = [360, 480, 720, 1080]
+    return [
+        Video(
+            id=index + 1,
+            created_at=now - timedelta(minutes=index, microseconds=index),
+            title=f"Video {index} – Café",
+            description="A short description of the video. " * 4,
+            thumbnail=f"videos/video_{index + 1}/thumbnail.jpg",
+            thumbnail_derivatives={
+                "version": f"{index:08x}",
+                "avif": [320, 640, 1280],
+                "webp": [320, 640, 1280],
+            },
+            category=categories[index % len(categories)],
+            status="ready",
+            width=heights[index % len(heights)] * 16 // 9,
+            height=heights[index % len(heights)],
+            duration=60.0 + index,
+            video_codec="h264",
+            audio_codec="aac",
+            frame_rate=25.0,
+            bitrate=4_000_000 + index,
+        )
+        for index in range(count)
+    ]
+
+
+def video_values(video, columns):
+    """
+    Return the `.values()` row of an unsaved video.
+    """
+    row = {column: getattr(video, column) for column in columns}
+    row["thumbnail"] = video.thumbnail.name
+    return row
@@ -0,0 +1,176 @@
+"""
+Management command to benchmark HLS transcoding strategies.
+
+Compares wall time and CPU seconds spent in ffmpeg for the
+per-resolution loop, the single-pass multi-rendition command and
+chunked transcoding in a process pool. Every strategy writes MPEG-TS
+segments, as chunked transcoding does not support fMP4 renditions.
+"""
+
+import resource
+import subprocess
+import tempfile
+import time
+from functools import partial
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from video_app.tasks import build_resolution_command, build_variants_command
+from video_app.utils.chunked_transcoding import transcode_in_chunks
+from video_app.utils.renditions import RESOLUTIONS
+
+
+class Command(BaseCommand):
+    help = "Benchmark HLS transcoding strategies on a source or synthetic clip."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--source",
+            help="Video file to transcode. A synthetic clip is used if omitted.",
+        )
+        parser.add_argument(
+            "--duration",
+            type=int,
+            default=60,
+            help="Length in seconds of the synthetic clip.",
+        )
+        parser.add_argument(
+            "--runs",
+            type=int,
+            default=1,
+            help="Number of runs per strategy.",
+        )
+        parser.add_argument(
+            "--chunk-seconds",
+            type=int,
+            default=30,
+            help="Chunk length for the chunked strategy.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=0,
+            help="Process pool size for the chunked strategy (0 = all cores).",
+        )
+
+    def handle(self, *args, **options):
+        self.chunk_seconds = options["chunk_seconds"]
+        self.workers = options["workers"]
+
+        with tempfile.TemporaryDirectory() as tmp:
+            work_dir = Path(tmp)
+            source = options["source"] or self.create_synthetic_clip(
+                work_dir, options["duration"]
+            )
+
+            strategies = {
+                "loop": self.run_loop,
+                "single-pass": self.run_single_pass,
+                "chunked": self.run_chunked,
+            }
+
+            for name, strategy in strategies.items():
+                for run in range(options["runs"]):
+                    output_dir = work_dir / f"{name}_{run}"
+                    wall, cpu = measure(strategy, source, output_dir)
+                    self.stdout.write(
+                        f"{name:<12} run {run + 1}: "
+                        f"wall {wall:8.2f}s  cpu {cpu:8.2f}s"
+                    )
+
+    def create_synthetic_clip(self, work_dir, duration):
+        """
+        Render a 1080p test clip with audio using ffmpeg's lavfi sources.
+        """
+        self.stdout.write(f"Generating {duration}s synthetic 1080p clip...")
+        clip_path = work_dir / "source.mp4"
+        cmd = [
+            "ffmpeg",
+            "-f",
+            "lavfi",
+            "-i",
+            "testsrc2=size=1920x1080:rate=25",
+            "-f",
+            "lavfi",
+            "-i",
+            "sine=frequency=440",
+            "-t",
+            str(duration),
+            "-pix_fmt",
+            "yuv420p",
+            str(clip_path),
+        ]
+        run_ffmpeg(cmd)
+        return str(clip_path)
+
+    def run_loop(self, source, output_dir):
+        """
+        Transcode every resolution with its own ffmpeg process.
+        """
+        for resolution, scale in RESOLUTIONS.items():
+            target_dir = output_dir / f"{resolution}p"
+            target_dir.mkdir(parents=True, exist_ok=True)
+            run_ffmpeg(
+                build_resolution_command(
+                    source, target_dir / "index.m3u8", scale, "mpegts"
+                )
+            )
+
+    def run_single_pass(self, source, output_dir):
+        """
+        Transcode every resolution with one decoding ffmpeg process.
+        """
+        targets = {}
+        for resolution in RESOLUTIONS:
+            target_dir = output_dir / f"{resolution}p"
+            target_dir.mkdir(parents=True, exist_ok=True)
+            targets[resolution] = target_dir / "index.m3u8"
+        run_ffmpeg(build_variants_command(source, targets, segment_type="mpegts"))
+
+    def run_chunked(self, source, output_dir):
+        """
+        Transcode keyframe-aligned chunks in a process pool and stitch them.
+        """
+        targets = {}
+        for resolution in RESOLUTIONS:
+            target_dir = output_dir / f"{resolution}p"
+            target_dir.mkdir(parents=True, exist_ok=True)
+            targets[resolution] = target_dir / "index.m3u8"
+
+        success = transcode_in_chunks(
+            source,
+            targets,
+            output_dir / "chunks",
+            partial(build_variants_command, segment_type="mpegts"),
+            self.chunk_seconds,
+            self.workers,
+        )
+        if not success:
+            raise CommandError("Chunked transcoding failed.")
+
+
+def measure(strategy, source, output_dir):
+    """
+    Return wall time and child CPU seconds spent running a strategy.
+    """
+    usage_before = resource.getrusage(resource.RUSAGE_CHILDREN)
+    started = time.perf_counter()
+
+    strategy(source, output_dir)
+
+    wall = time.perf_counter() - started
+    usage_after = resource.getrusage(resource.RUSAGE_CHILDREN)
+    cpu = (usage_after.ru_utime - usage_before.ru_utime) + (
+        usage_after.ru_stime - usage_before.ru_stime
+    )
+    return wall, cpu
+
+
+def run_ffmpeg(cmd):
+    """
+    Run an ffmpeg command and raise a CommandError if it fails.
+    """
+    result = subprocess.run(cmd, capture_output=True)
+    if result.returncode != 0:
+        raise CommandError(result.stderr.decode(errors="replace")[-2000:])
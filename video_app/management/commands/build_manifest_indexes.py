@@ -0,0 +1,41 @@
+"""
+Management command to index ready videos published without a manifest index.
+
+Videos processed before the manifest index existed are only delivered
+once their processed directory has been indexed.
+"""
+
+from django.core.management.base import BaseCommand
+
+from video_app.models import Video
+from video_app.tasks import MEDIA_ROOT
+from video_app.utils.manifest_index import build_manifest_index
+
+
+class Command(BaseCommand):
+    help = "Build the manifest index of ready videos that have none."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Rebuild the index of every ready video.",
+        )
+
+    def handle(self, *args, **options):
+        videos = Video.objects.filter(status="ready")
+        if not options["all"]:
+            videos = videos.filter(manifest_index={})
+
+        count = 0
+        for video in videos.only("id"):
+            processed_root = MEDIA_ROOT / "videos" / f"video_{video.id}" / "processed"
+            if not processed_root.is_dir():
+                self.stderr.write(f"Video {video.id} has no processed directory.")
+                continue
+
+            video.manifest_index = build_manifest_index(processed_root)
+            video.save(update_fields=["manifest_index"])
+            count += 1
+
+        self.stdout.write(f"Indexed {count} video(s).")
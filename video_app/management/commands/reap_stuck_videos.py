@@ -0,0 +1,19 @@
+"""
+Management command to recover videos stuck in processing.
+
+Re-enqueues every video whose status is `processing` but which has
+no queued, running, deferred or scheduled job anymore, e.g. because
+its worker was killed during a redeploy.
+"""
+
+from django.core.management.base import BaseCommand
+
+from video_app.tasks import reap_stuck_videos
+
+
+class Command(BaseCommand):
+    help = "Re-enqueue videos stuck in processing without a live job."
+
+    def handle(self, *args, **options):
+        video_ids = reap_stuck_videos()
+        self.stdout.write(f"Re-enqueued {len(video_ids)} stuck video(s).")
@@ -0,0 +1,26 @@
+# Generated by Django 6.0 on 2026-10-18 19:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('video_app', '0004_video_source_properties'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProcessingCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('stage', models.CharField(max_length=50)),
+                ('completed_at', models.DateTimeField(auto_now_add=True)),
+                ('video', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='checkpoints', to='video_app.video')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('video', 'stage'), name='unique_video_checkpoint')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-18 19:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('video_app', '0006_video_upload'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='video',
+            name='thumbnail_derivatives',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
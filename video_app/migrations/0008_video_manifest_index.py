@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-18 19:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('video_app', '0007_video_thumbnail_derivatives'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='video',
+            name='manifest_index',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 6.0 on 2026-10-18 19:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('video_app', '0008_video_manifest_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='video',
+            index=models.Index(fields=['status', 'created_at', 'id'], name='video_status_created_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-18 20:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('video_app', '0010_video_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='video',
+            name='conversion_retries',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+    ]
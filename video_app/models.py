@@ -2,9 +2,30 @@
 Database models for the video_app.
 """
 
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 
 
+# Large columns read through `.values()` and queries only, never from
+# loaded instances
+DEFERRED_FIELDS = ("manifest_index", "search_vector")
+
+
+class VideoManager(models.Manager):
+    """
+    Default manager of Video that defers the index columns.
+
+    The manifest index holds an entry per published file, about 2,000
+    for a feature film, and would otherwise be decoded with every video
+    loaded by the pipeline, the API or the admin. Accessing a deferred
+    field on an instance still loads it on demand.
+    """
+
+    def get_queryset(self):
+        return super().get_queryset().defer(*DEFERRED_FIELDS)
+
+
 class Video(models.Model):
     """
     Represents a video uploaded to the platform.
@@ -14,6 +35,7 @@ class Video(models.Model):
     """
 
     STATUS_CHOICES = [
+        ("uploading", "Uploading"),
         ("pending", "Pending"),
         ("processing", "Processing"),
         ("ready", "Ready"),
@@ -37,6 +59,10 @@ class Video(models.Model):
     description = models.TextField()
     original_file = models.FileField(upload_to="videos/originals/")
     thumbnail = models.ImageField(blank=True, null=True)
+    # Version token and widths per format of the resized thumbnails
+    thumbnail_derivatives = models.JSONField(default=dict, blank=True)
+    # Size, mtime and hash of every published playlist and segment
+    manifest_index = models.JSONField(default=dict, blank=True, editable=False)
     category = models.CharField(max_length=50, choices=CATEGORY_CHOICES)
     status = models.CharField(
         max_length=15,
@@ -44,8 +70,73 @@ class Video(models.Model):
         default="pending",
     )
 
+    # Source properties filled in by the probing stage before conversion
+    width = models.PositiveIntegerField(blank=True, null=True)
+    height = models.PositiveIntegerField(blank=True, null=True)
+    duration = models.FloatField(blank=True, null=True)
+    video_codec = models.CharField(max_length=50, blank=True)
+    audio_codec = models.CharField(max_length=50, blank=True)
+    frame_rate = models.FloatField(blank=True, null=True)
+    bitrate = models.PositiveBigIntegerField(blank=True, null=True)
+
+    # Chunked uploads: expected size in bytes and SHA-256 of the original
+    upload_size = models.PositiveBigIntegerField(blank=True, null=True)
+    content_hash = models.CharField(max_length=64, blank=True)
+
+    # Conversions re-enqueued after their worker died, capped by
+    # VIDEO_MAX_CONVERSION_RETRIES
+    conversion_retries = models.PositiveSmallIntegerField(default=0, editable=False)
+
+    # Weighted tsvector of title, description and category, maintained
+    # by the post_save signal
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = VideoManager()
+
+    class Meta:
+        indexes = [
+            # Covers the ready-video list and its (created_at, id) cursor
+            models.Index(
+                fields=["status", "created_at", "id"],
+                name="video_status_created_idx",
+            ),
+            GinIndex(fields=["search_vector"], name="video_search_vector_idx"),
+        ]
+
     def __str__(self):
         """
         Return a human-readable representation of the video.
         """
         return self.title
+
+
+class ProcessingCheckpoint(models.Model):
+    """
+    Records a processing stage of a video that has been completed.
+
+    Stages are "probe", one per rendition such as "720p", "thumbnail"
+    and "trickplay".
+    A retried conversion skips every stage with a checkpoint.
+    """
+
+    video = models.ForeignKey(
+        Video,
+        on_delete=models.CASCADE,
+        related_name="checkpoints",
+    )
+    stage = models.CharField(max_length=50)
+    completed_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["video", "stage"],
+                name="unique_video_checkpoint",
+            ),
+        ]
+
+    def __str__(self):
+        """
+        Return a human-readable representation of the checkpoint.
+        """
+        return f"{self.video_id}: {self.stage}"
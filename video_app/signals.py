@@ -2,34 +2,75 @@
 Signals for the video_app.
 
 Triggers background video processing after a video
-has been successfully created.
+has been successfully created, keeps the ready-video
+and video list caches in sync with the database and
+maintains the full-text search vector.
 """
 
 import logging
 
-import django_rq
 from django.db import transaction
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
 from .models import Video
-from .tasks import convert_video
+from .tasks import enqueue_video_conversion
+from .utils.list_cache import invalidate_video_list
+from .utils.manifest_index import invalidate_manifest_index
+from .utils.ready_cache import invalidate_video_ready
+from .utils.search import update_search_vector
 
 logger = logging.getLogger(__name__)
 
+# Fields included in the full-text search vector
+SEARCHABLE_FIELDS = {"title", "description", "category"}
+
 
 @receiver(post_save, sender=Video)
 def video_post_save(sender, instance, created, **kwargs):
     """
     Enqueue video processing task after a new video is created.
+
+    Videos created by the chunked upload API start as `uploading`
+    and are enqueued once their last chunk has arrived.
     """
-    if not created:
+    if not created or instance.status != "pending":
         return
 
     logger.info("---> Video '%s' created. Enqueuing processing task.", instance.title)
 
-    def enqueue_job():
-        queue = django_rq.get_queue("default")
-        queue.enqueue(convert_video, instance.id)
+    transaction.on_commit(lambda: enqueue_video_conversion(instance.id))
+
+
+@receiver(post_save, sender=Video)
+def video_update_search_vector(sender, instance, created, update_fields, **kwargs):
+    """
+    Recompute the search vector when a video's searchable text changes.
+
+    Saves limited to other fields, such as status updates of the
+    processing pipeline, skip the extra UPDATE.
+    """
+    if update_fields is not None and not SEARCHABLE_FIELDS & set(update_fields):
+        return
+
+    update_search_vector(instance.id)
+
+
+@receiver(post_save, sender=Video)
+@receiver(post_delete, sender=Video)
+def video_invalidate_ready_cache(sender, instance, **kwargs):
+    """
+    Drop the cached readiness and manifest index of a video and all
+    cached list responses once a save or delete is committed.
+
+    Every status change goes through a save, so the caches never outlive
+    the state they were read from.
+    """
+    video_id = instance.id
+
+    def on_commit():
+        invalidate_video_ready(video_id)
+        invalidate_manifest_index(video_id)
+        invalidate_video_list()
 
-    transaction.on_commit(enqueue_job)
+    transaction.on_commit(on_commit)
@@ -1,171 +1,840 @@
 """
 Background tasks for video processing.
 
-Handles directory preparation, HLS conversion via ffmpeg,
-thumbnail creation, cleanup on failure, and moving original files.
+Handles source probing, directory preparation, HLS conversion via ffmpeg,
+master playlist generation, thumbnail creation, cleanup on failure,
+and moving original files.
+Renditions can either be converted in one worker or fanned out
+as separate jobs that are joined by a finalizer job.
+
+Every completed stage is recorded as a checkpoint and its outputs are
+written to a scratch directory before being published by an atomic
+rename, so a retried conversion only redoes unfinished stages.
 """
 
+import errno
 import logging
+import os
 import shutil
 import subprocess
 from pathlib import Path
 
+import django_rq
 from django.conf import settings
-
-from .models import Video
+from django.db.models import F
+from rq import Worker
+from rq.exceptions import AbandonedJobError
+from rq.job import Dependency, Job
+
+from .models import ProcessingCheckpoint, Video
+from .utils.chunked_transcoding import transcode_in_chunks
+from .utils.ffprobe import probe_source, probe_video_stream
+from .utils.hls import (
+    AAC_LC_CODEC,
+    avc_codec_string,
+    measure_bandwidth,
+    read_playlist_entries,
+    write_master_playlist,
+)
+from .utils.manifest_index import build_manifest_index
+from .utils.progress import publish_progress, run_ffmpeg
+from .utils.renditions import RESOLUTIONS, get_rendition_ladder
+from .utils.uploads import content_hash
+from .utils.thumbnails import (
+    THUMBNAIL_NAME,
+    build_candidates_command,
+    candidate_timestamps,
+    create_derivatives,
+    pick_best_frame,
+)
+from .utils.trickplay import (
+    build_sprite_command,
+    sprite_duration,
+    tile_size,
+    write_webvtt,
+)
 
 logger = logging.getLogger(__name__)
 
 MEDIA_ROOT = Path(settings.MEDIA_ROOT)
 
-# Standard ffmpeg scales for target resolutions
-RESOLUTIONS = {
-    "480": "854:480",
-    "720": "1280:720",
-    "1080": "1920:1080",
+# Directories below a video's root written by the conversion, removed
+# again when it fails
+GENERATED_DIRECTORIES = ("processed", "thumbnails", "trickplay", "scratch")
+
+# Block size used when an original has to be copied between filesystems
+COPY_BUFFER_SIZE = 8 * 1024 * 1024
+
+# Target duration of a single HLS segment in seconds
+HLS_SEGMENT_SECONDS = 10
+
+# Encoder options shared by every rendition. Keyframes are forced on the
+# segment grid and scene-cut keyframes are disabled, so all renditions
+# have aligned GOPs and segment boundaries for adaptive bitrate switching.
+ENCODING_OPTIONS = [
+    "-c:v",
+    "libx264",
+    "-profile:v",
+    "main",
+    "-pix_fmt",
+    "yuv420p",
+    "-force_key_frames",
+    f"expr:gte(t,n_forced*{HLS_SEGMENT_SECONDS})",
+    "-sc_threshold",
+    "0",
+    "-c:a",
+    "aac",
+    "-ac",
+    "2",
+]
+
+# Shared HLS muxer options for every rendition output
+HLS_OUTPUT_OPTIONS = [
+    *ENCODING_OPTIONS,
+    "-start_number",
+    "0",
+    "-hls_time",
+    str(HLS_SEGMENT_SECONDS),
+    "-hls_list_size",
+    "0",
+    "-f",
+    "hls",
+]
+
+# Muxer options per segment type. MPEG-TS writes one file per segment,
+# fMP4 (CMAF) writes a single index.m4s per rendition whose init section
+# and segments the playlist addresses by byte range.
+HLS_SEGMENT_OPTIONS = {
+    "mpegts": [
+        "-hls_flags",
+        "independent_segments",
+    ],
+    "fmp4": [
+        "-hls_segment_type",
+        "fmp4",
+        "-hls_flags",
+        "single_file+independent_segments",
+    ],
 }
 
 
+def enqueue_video_conversion(video_id):
+    """
+    Enqueue the conversion job of a video on the default queue.
+    """
+    queue = django_rq.get_queue("default")
+    return queue.enqueue(convert_video, video_id, meta={"video_id": video_id})
+
+
 def convert_video(video_id):
     """
-    Convert a video to multiple HLS resolutions and generate a thumbnail.
+    Convert a video to multiple HLS resolutions and generate a thumbnail
+    and trickplay sprites.
     """
     video = Video.objects.get(id=video_id)
 
     video.status = "processing"
     video.save(update_fields=["status"])
 
+    completed = completed_stages(video)
+
+    if "probe" not in completed and not probe_video(video):
+        return
+
     prepare_directories(video)
 
-    success = convert_original_to_variants(video) and create_thumbnail(video)
+    if settings.VIDEO_FAN_OUT:
+        enqueue_conversion_jobs(video, completed)
+        return
+
+    success = (
+        convert_original_to_variants(video, pending_renditions(video, completed))
+        and create_master_playlist(video)
+        and ("thumbnail" in completed or create_thumbnail(video))
+    )
+
+    if not success:
+        delete_directories(video)
+        return
+
+    # Trickplay is a preview feature, so its failure does not block publishing
+    if "trickplay" not in completed:
+        create_trickplay(video)
+
+    publish_video(video)
+
+
+def enqueue_conversion_jobs(video, completed):
+    """
+    Enqueue one job per pending resolution, thumbnail and trickplay jobs
+    and a finalizer.
+
+    The child jobs can run concurrently on any worker listening to the
+    transcode queue. The finalizer runs once all of them have ended,
+    whether they succeeded or not. Stages in `completed` are skipped.
+    """
+    queue = django_rq.get_queue(settings.VIDEO_TRANSCODE_QUEUE)
+    meta = {"video_id": video.id}
+
+    jobs = [
+        queue.enqueue(convert_video_resolution, video.id, resolution, meta=meta)
+        for resolution in pending_renditions(video, completed)
+    ]
+    if "thumbnail" not in completed:
+        jobs.append(queue.enqueue(create_video_thumbnail, video.id, meta=meta))
+    if "trickplay" not in completed:
+        jobs.append(queue.enqueue(create_video_trickplay, video.id, meta=meta))
+
+    queue.enqueue(
+        finalize_video,
+        video.id,
+        [job.id for job in jobs],
+        depends_on=Dependency(jobs=jobs, allow_failure=True) if jobs else None,
+        meta=meta,
+    )
+
+    logger.info(
+        "---> Enqueued %s conversion jobs for video %s", len(jobs), video.id
+    )
+
+
+def convert_video_resolution(video_id, resolution):
+    """
+    Job wrapper converting a video to a single HLS resolution.
+    """
+    video = Video.objects.get(id=video_id)
+    return convert_resolution(video, resolution, RESOLUTIONS[resolution])
+
+
+def create_video_thumbnail(video_id):
+    """
+    Job wrapper generating the thumbnail of a video.
+    """
+    video = Video.objects.get(id=video_id)
+    return create_thumbnail(video)
+
+
+def create_video_trickplay(video_id):
+    """
+    Job wrapper generating the trickplay sprites of a video.
+    """
+    video = Video.objects.get(id=video_id)
+    return create_trickplay(video)
+
+
+def finalize_video(video_id, job_ids):
+    """
+    Publish a video once every conversion stage has succeeded.
+
+    Success is read from the checkpoints of the rendition ladder and
+    the thumbnail instead of the results of the child jobs in
+    `job_ids`, which expire from Redis after RQ's result TTL and may be
+    gone by the time the slowest child ends. Writes the master playlist
+    and cleans up all generated directories if any stage is missing.
+
+    Children abandoned by a dying worker are no ffmpeg failure: if no
+    other child failed, the published stages and their checkpoints are
+    kept and the video is re-enqueued to convert the rest.
+    """
+    video = Video.objects.get(id=video_id)
+
+    success = required_stages(video) <= completed_stages(video) and (
+        create_master_playlist(video)
+    )
+
+    if not success and video.status != "error":
+        connection = django_rq.get_connection(settings.VIDEO_TRANSCODE_QUEUE)
+        failed_jobs = [
+            job
+            for job in Job.fetch_many(job_ids, connection=connection)
+            if job and job.is_failed
+        ]
+        if failed_jobs and all(is_abandoned(job) for job in failed_jobs):
+            logger.warning(
+                "---> Re-enqueuing video %s after abandoned conversion jobs",
+                video.id,
+            )
+            retry_conversion(video.id)
+            return
 
     if not success:
+        logger.error("Conversion jobs failed for video %s", video.id)
         delete_directories(video)
+        video.status = "error"
+        video.save(update_fields=["status"])
         return
 
+    publish_video(video)
+
+
+def is_abandoned(job):
+    """
+    Return whether a failed job was abandoned by a worker that died.
+    """
+    result = job.latest_result()
+    return bool(
+        result
+        and result.exc_string
+        and AbandonedJobError.__name__ in result.exc_string
+    )
+
+
+def publish_video(video):
+    """
+    Move the original into place, index the published renditions
+    and mark the video as ready.
+    """
     move_original(video)
 
+    video_root = MEDIA_ROOT / "videos" / f"video_{video.id}"
+    shutil.rmtree(video_root / "scratch", ignore_errors=True)
+
+    video.manifest_index = build_manifest_index(video_root / "processed")
     video.status = "ready"
-    video.save(update_fields=["status"])
+    video.save(update_fields=["manifest_index", "status"])
+
+
+def completed_stages(video):
+    """
+    Return the names of all processing stages the video has completed.
+    """
+    return set(video.checkpoints.values_list("stage", flat=True))
+
+
+def required_stages(video):
+    """
+    Return the names of the stages a video needs before it is published.
+
+    Trickplay sprites are optional and published without if they fail.
+    """
+    return {
+        *(f"{resolution}p" for resolution in get_rendition_ladder(video)),
+        "thumbnail",
+    }
+
+
+def record_checkpoint(video, stage):
+    """
+    Record that a processing stage of the video has completed.
+    """
+    ProcessingCheckpoint.objects.get_or_create(video=video, stage=stage)
+
+
+def pending_renditions(video, completed):
+    """
+    Return the part of the rendition ladder without a checkpoint.
+    """
+    return {
+        resolution: scale
+        for resolution, scale in get_rendition_ladder(video).items()
+        if f"{resolution}p" not in completed
+    }
+
+
+def publish_path(scratch_path, target_path):
+    """
+    Atomically move a finished output from scratch to its final location.
+
+    Scratch and target live below the same video directory, so the
+    rename never crosses a filesystem boundary.
+    """
+    target_path.parent.mkdir(parents=True, exist_ok=True)
+    if target_path.is_dir():
+        shutil.rmtree(target_path)
+    os.replace(scratch_path, target_path)
+
+
+def reap_stuck_videos():
+    """
+    Re-enqueue every video stuck in processing without a live job.
+
+    Jobs of crashed workers are moved out of the started registries
+    first, so only queued, running, deferred or scheduled jobs count
+    as live. Started jobs whose worker is no longer registered are not
+    live either, as their registry entry only expires with the worker's
+    heartbeat. Returns the ids of the re-enqueued videos.
+    """
+    live_video_ids = set()
+    for queue_name in {"default", settings.VIDEO_TRANSCODE_QUEUE}:
+        queue = django_rq.get_queue(queue_name)
+        queue.started_job_registry.cleanup()
+        worker_names = {
+            worker.name for worker in Worker.all(connection=queue.connection)
+        }
+
+        job_ids = [
+            *queue.get_job_ids(),
+            *queue.started_job_registry.get_job_ids(),
+            *queue.deferred_job_registry.get_job_ids(),
+            *queue.scheduled_job_registry.get_job_ids(),
+        ]
+        for job in Job.fetch_many(job_ids, connection=queue.connection):
+            if not job:
+                continue
+            if (
+                job.is_started
+                and job.worker_name
+                and job.worker_name not in worker_names
+            ):
+                continue
+            live_video_ids.add(job.meta.get("video_id"))
+
+    stuck_ids = list(
+        Video.objects.filter(status="processing")
+        .exclude(id__in=[video_id for video_id in live_video_ids if video_id])
+        .values_list("id", flat=True)
+    )
+
+    reenqueued_ids = []
+    for video_id in stuck_ids:
+        logger.warning("---> Re-enqueuing stuck video %s", video_id)
+        if retry_conversion(video_id):
+            reenqueued_ids.append(video_id)
+
+    return reenqueued_ids
+
+
+def retry_conversion(video_id):
+    """
+    Re-enqueue the conversion of a video, or mark it as failed.
+
+    Every retry is counted on the video. A conversion that crashes its
+    worker every time, e.g. by an uncaught exception or an OOM kill, is
+    given up after VIDEO_MAX_CONVERSION_RETRIES retries instead of
+    re-running its stages forever. Returns whether it was re-enqueued.
+    """
+    videos = Video.objects.filter(id=video_id)
+    videos.update(conversion_retries=F("conversion_retries") + 1)
+    video = videos.only("status", "conversion_retries").first()
+    if video is None:
+        return False
+
+    if video.conversion_retries > settings.VIDEO_MAX_CONVERSION_RETRIES:
+        logger.error(
+            "Giving up video %s after %s retries",
+            video.id,
+            video.conversion_retries - 1,
+        )
+        video.status = "error"
+        video.save(update_fields=["status"])
+        return False
+
+    enqueue_video_conversion(video.id)
+    return True
+
+
+def probe_video(video):
+    """
+    Analyse the original with ffprobe and store its properties on the video.
+
+    The SHA-256 content hash is computed here as well, in one sequential
+    read of the original, unless the video already has one.
+    """
+    logger.info("---> Probing video %s", video.id)
+
+    try:
+        properties = probe_source(video.original_file.path)
+        if not video.content_hash:
+            properties["content_hash"] = content_hash(video.original_file.path)
+    except (subprocess.CalledProcessError, ValueError):
+        logger.error("FFprobe failed for video %s", video.id)
+        video.status = "error"
+        video.save(update_fields=["status"])
+        return False
+
+    for field, value in properties.items():
+        setattr(video, field, value)
+    video.save(update_fields=list(properties))
+    record_checkpoint(video, "probe")
+
+    return True
 
 
 def prepare_directories(video):
     """
     Create all required directories for video processing.
+
+    Rendition directories are not created here, they only appear
+    once published from the scratch directory.
     """
     video_root = MEDIA_ROOT / "videos" / f"video_{video.id}"
 
     (video_root / "original").mkdir(parents=True, exist_ok=True)
-    (video_root / "processed" / "480p").mkdir(parents=True, exist_ok=True)
-    (video_root / "processed" / "720p").mkdir(parents=True, exist_ok=True)
-    (video_root / "processed" / "1080p").mkdir(parents=True, exist_ok=True)
+    (video_root / "processed").mkdir(parents=True, exist_ok=True)
     (video_root / "thumbnails").mkdir(parents=True, exist_ok=True)
+    (video_root / "scratch").mkdir(parents=True, exist_ok=True)
 
 
-def convert_original_to_variants(video):
+def convert_original_to_variants(video, ladder):
     """
-    Convert the original video into all configured resolutions.
+    Convert the original video into all resolutions of the given ladder.
+
+    The original is decoded once and the frames are split across
+    one scaler and HLS muxer per resolution in a single ffmpeg run.
     """
-    for resolution, scale in RESOLUTIONS.items():
-        if not convert_resolution(video, resolution, scale):
-            return False
+    if not ladder:
+        return True
+
+    logger.info(
+        "---> Converting video %s to %s in a single pass",
+        video.id,
+        ", ".join(f"{resolution}p" for resolution in ladder),
+    )
+
+    video_root = MEDIA_ROOT / "videos" / f"video_{video.id}"
+    targets = {}
+    for resolution in ladder:
+        scratch_dir = video_root / "scratch" / f"{resolution}p"
+        if scratch_dir.exists():
+            shutil.rmtree(scratch_dir)
+        scratch_dir.mkdir(parents=True)
+        targets[resolution] = scratch_dir / "index.m3u8"
+
+    stderr = ""
+    if chunked_transcoding_enabled():
+        success = convert_in_chunks(video, targets, "variants")
+    else:
+        cmd = build_variants_command(video.original_file.path, targets)
+        returncode, stderr = run_ffmpeg(cmd, video.id, "variants", video.duration)
+        success = returncode == 0
+
+    if not success:
+        logger.error(
+            "FFmpeg failed for video %s (all variants)\n%s", video.id, stderr
+        )
+        video.status = "error"
+        video.save(update_fields=["status"])
+        return False
+
+    for resolution, scratch_path in targets.items():
+        publish_path(
+            scratch_path.parent, video_root / "processed" / f"{resolution}p"
+        )
+        record_checkpoint(video, f"{resolution}p")
+
     return True
 
 
-def convert_resolution(video, resolution, scale):
+def convert_in_chunks(video, targets, stage):
     """
-    Convert a video to a single HLS resolution using ffmpeg.
-    """
-    logger.info("---> Converting video %s to %sp", video.id, resolution)
+    Convert a video chunk by chunk in a process pool.
 
+    Each worker transcodes one keyframe-aligned time range of the
+    original into every target, the chunks are stitched afterwards.
+    Progress is published as the share of finished chunks.
+    """
     video_root = MEDIA_ROOT / "videos" / f"video_{video.id}"
-    target_dir = video_root / "processed" / f"{resolution}p"
-    target_dir.mkdir(parents=True, exist_ok=True)
+    work_dir = video_root / "scratch" / f"chunks_{'_'.join(targets)}"
+
+    def report_progress(finished, total):
+        publish_progress(
+            video.id,
+            stage,
+            state="running",
+            percent=round(finished / total * 100, 1),
+        )
+
+    report_progress(0, 1)
+    success = transcode_in_chunks(
+        video.original_file.path,
+        targets,
+        work_dir,
+        build_variants_command,
+        settings.VIDEO_CHUNK_SECONDS,
+        settings.VIDEO_CHUNK_WORKERS,
+        duration=video.duration,
+        progress_callback=report_progress,
+    )
+    publish_progress(
+        video.id,
+        stage,
+        state="done" if success else "failed",
+        percent=100.0 if success else None,
+    )
+    return success
+
+
+def chunked_transcoding_enabled():
+    """
+    Return whether renditions are transcoded in chunks.
+
+    Chunks are stitched as MPEG-TS segments, so fMP4 renditions are
+    always converted in a single pass.
+    """
+    return (
+        settings.VIDEO_CHUNKED_TRANSCODING
+        and settings.VIDEO_HLS_SEGMENT_TYPE == "mpegts"
+    )
+
+
+def build_variants_command(
+    source_path, targets, start=None, duration=None, segment_type=None
+):
+    """
+    Build a single ffmpeg command writing one HLS rendition per target.
+
+    `targets` maps a resolution key from RESOLUTIONS to the path
+    of the playlist that should be written for it. If `start` and
+    `duration` are given, only that time range is converted while
+    keeping the timestamps of the original. `segment_type` defaults
+    to VIDEO_HLS_SEGMENT_TYPE.
+    """
+    segment_options = HLS_SEGMENT_OPTIONS[
+        segment_type or settings.VIDEO_HLS_SEGMENT_TYPE
+    ]
+    labels = [f"v{index}" for index in range(len(targets))]
+
+    split_outputs = "".join(f"[{label}]" for label in labels)
+    filters = [f"[0:v]split={len(targets)}{split_outputs}"]
+    for label, resolution in zip(labels, targets):
+        filters.append(f"[{label}]scale={RESOLUTIONS[resolution]}[{label}out]")
 
-    target_path = target_dir / "index.m3u8"
+    cmd = ["ffmpeg"]
+    output_options = []
+    if start is not None:
+        cmd += ["-ss", f"{start:.6f}", "-t", f"{duration:.6f}"]
+        output_options = ["-output_ts_offset", f"{start:.6f}"]
 
-    cmd = [
+    cmd += [
+        "-i",
+        str(source_path),
+        "-filter_complex",
+        ";".join(filters),
+    ]
+
+    for label, target_path in zip(labels, targets.values()):
+        cmd += [
+            "-map",
+            f"[{label}out]",
+            "-map",
+            "0:a?",
+            *output_options,
+            *HLS_OUTPUT_OPTIONS,
+            *segment_options,
+            str(target_path),
+        ]
+
+    return cmd
+
+
+def build_resolution_command(source_path, target_path, scale, segment_type=None):
+    """
+    Build the ffmpeg command for a single HLS rendition.
+    """
+    return [
         "ffmpeg",
         "-i",
-        video.original_file.path,
+        str(source_path),
         "-vf",
         f"scale={scale}",
-        "-start_number",
-        "0",
-        "-hls_time",
-        "10",
-        "-hls_list_size",
-        "0",
-        "-f",
-        "hls",
+        *HLS_OUTPUT_OPTIONS,
+        *HLS_SEGMENT_OPTIONS[segment_type or settings.VIDEO_HLS_SEGMENT_TYPE],
         str(target_path),
     ]
 
-    result = subprocess.run(cmd, capture_output=True)
 
-    if result.returncode != 0:
-        logger.error("FFmpeg failed for video %s (%sp)", video.id, resolution)
+def convert_resolution(video, resolution, scale):
+    """
+    Convert a video to a single HLS resolution using ffmpeg.
+    """
+    logger.info("---> Converting video %s to %sp", video.id, resolution)
+
+    video_root = MEDIA_ROOT / "videos" / f"video_{video.id}"
+    scratch_dir = video_root / "scratch" / f"{resolution}p"
+    if scratch_dir.exists():
+        shutil.rmtree(scratch_dir)
+    scratch_dir.mkdir(parents=True)
+
+    target_path = scratch_dir / "index.m3u8"
+
+    stage = f"{resolution}p"
+    stderr = ""
+    if chunked_transcoding_enabled():
+        success = convert_in_chunks(video, {resolution: target_path}, stage)
+    else:
+        cmd = build_resolution_command(
+            video.original_file.path, target_path, scale
+        )
+        returncode, stderr = run_ffmpeg(cmd, video.id, stage, video.duration)
+        success = returncode == 0
+
+    if not success:
+        logger.error(
+            "FFmpeg failed for video %s (%sp)\n%s", video.id, resolution, stderr
+        )
         video.status = "error"
         video.save(update_fields=["status"])
         return False
 
+    publish_path(scratch_dir, video_root / "processed" / stage)
+    record_checkpoint(video, stage)
+
     return True
 
 
-def create_thumbnail(video):
+def create_master_playlist(video):
     """
-    Generate a thumbnail image from the video using ffmpeg.
+    Write processed/master.m3u8 referencing every rendition of the video.
+
+    BANDWIDTH is the measured peak segment bitrate of each rendition and
+    CODECS is derived from the encoded H.264 profile and level.
     """
-    logger.info("---> Creating thumbnail for video %s", video.id)
+    logger.info("---> Creating master playlist for video %s", video.id)
+
+    processed_root = MEDIA_ROOT / "videos" / f"video_{video.id}" / "processed"
+
+    variants = []
+    try:
+        for resolution, scale in get_rendition_ladder(video).items():
+            playlist_path = processed_root / f"{resolution}p" / "index.m3u8"
+            entries = read_playlist_entries(playlist_path)
+            profile, level = probe_video_stream(
+                playlist_path.parent / entries[0][1]
+            )
+
+            codecs = [avc_codec_string(profile, level)]
+            if video.audio_codec:
+                codecs.append(AAC_LC_CODEC)
+
+            bandwidth, average_bandwidth = measure_bandwidth(playlist_path)
+            variants.append(
+                {
+                    "uri": f"{resolution}p/index.m3u8",
+                    "bandwidth": bandwidth,
+                    "average_bandwidth": average_bandwidth,
+                    "resolution": scale.replace(":", "x"),
+                    "codecs": ",".join(codecs),
+                }
+            )
+    except (OSError, IndexError, ValueError, subprocess.CalledProcessError):
+        logger.error("Master playlist creation failed for video %s", video.id)
+        video.status = "error"
+        video.save(update_fields=["status"])
+        return False
 
-    thumbnail_root = (
-        MEDIA_ROOT / "videos" / f"video_{video.id}" / "thumbnails"
-    )
-    thumbnail_root.mkdir(parents=True, exist_ok=True)
+    write_master_playlist(processed_root / "master.m3u8", variants)
 
-    thumbnail_path = thumbnail_root / "thumbnail.jpg"
+    return True
 
-    cmd = [
-        "ffmpeg",
-        "-i",
-        video.original_file.path,
-        "-vf",
-        "thumbnail=n=100",
-        "-frames:v",
-        "1",
-        "-q:v",
-        "2",
-        str(thumbnail_path),
+
+def create_thumbnail(video):
+    """
+    Generate a thumbnail image and its responsive derivatives.
+
+    A few candidate keyframes are extracted by seeking with ffmpeg and
+    the one with the most visual information is kept. Pillow then writes
+    resized WebP/AVIF copies next to it.
+    """
+    logger.info("---> Creating thumbnail for video %s", video.id)
+
+    video_root = MEDIA_ROOT / "videos" / f"video_{video.id}"
+    scratch_dir = video_root / "scratch" / "thumbnails"
+    if scratch_dir.exists():
+        shutil.rmtree(scratch_dir)
+    scratch_dir.mkdir(parents=True)
+
+    timestamps = candidate_timestamps(video.duration)
+    candidate_paths = [
+        scratch_dir / f"candidate_{index}.jpg" for index in range(len(timestamps))
     ]
+    cmd = build_candidates_command(
+        video.original_file.path, timestamps, candidate_paths
+    )
 
-    result = subprocess.run(cmd, capture_output=True)
+    returncode, stderr = run_ffmpeg(cmd, video.id, "thumbnail")
+    best_path = pick_best_frame(candidate_paths) if returncode == 0 else None
 
-    if result.returncode != 0:
-        logger.error("Thumbnail creation failed for video %s", video.id)
+    if best_path is None:
+        logger.error("Thumbnail creation failed for video %s\n%s", video.id, stderr)
         video.status = "error"
         video.save(update_fields=["status"])
         return False
 
-    video.thumbnail.name = (
-        f"videos/video_{video.id}/thumbnails/thumbnail.jpg"
+    best_path.replace(scratch_dir / THUMBNAIL_NAME)
+    for candidate_path in candidate_paths:
+        candidate_path.unlink(missing_ok=True)
+
+    derivatives = create_derivatives(
+        scratch_dir / THUMBNAIL_NAME,
+        scratch_dir,
+        settings.VIDEO_THUMBNAIL_WIDTHS,
+        settings.VIDEO_THUMBNAIL_FORMATS,
     )
-    video.save(update_fields=["thumbnail"])
+    publish_path(scratch_dir, video_root / "thumbnails")
+
+    video.thumbnail.name = f"videos/video_{video.id}/thumbnails/{THUMBNAIL_NAME}"
+    video.thumbnail_derivatives = derivatives
+    video.save(update_fields=["thumbnail", "thumbnail_derivatives"])
+    record_checkpoint(video, "thumbnail")
+
+    return True
+
+
+def create_trickplay(video):
+    """
+    Generate scrubbing-preview sprite sheets and their WebVTT index.
+
+    Preview frames are sampled every VIDEO_TRICKPLAY_INTERVAL seconds
+    from a single decode of the original and published to trickplay/.
+    Without a probed duration the index covers every written sprite
+    sheet. Failures are logged but leave the video's status alone, as
+    trickplay is not required for publishing.
+    """
+    logger.info("---> Creating trickplay sprites for video %s", video.id)
+
+    video_root = MEDIA_ROOT / "videos" / f"video_{video.id}"
+    scratch_dir = video_root / "scratch" / "trickplay"
+    if scratch_dir.exists():
+        shutil.rmtree(scratch_dir)
+    scratch_dir.mkdir(parents=True)
+
+    interval = settings.VIDEO_TRICKPLAY_INTERVAL
+    tile_width, tile_height = tile_size(
+        video.width, video.height, settings.VIDEO_TRICKPLAY_WIDTH
+    )
+    cmd = build_sprite_command(
+        video.original_file.path, scratch_dir, interval, tile_width, tile_height
+    )
+
+    returncode, stderr = run_ffmpeg(cmd, video.id, "trickplay", video.duration)
+    sprite_count = len(list(scratch_dir.glob("sprite_*.jpg")))
+
+    if returncode != 0 or not sprite_count:
+        logger.warning(
+            "Trickplay creation failed for video %s\n%s", video.id, stderr
+        )
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+        return False
+
+    duration = video.duration or sprite_duration(sprite_count, interval)
+    write_webvtt(
+        scratch_dir / "index.vtt", duration, interval, tile_width, tile_height
+    )
+    publish_path(scratch_dir, video_root / "trickplay")
+    record_checkpoint(video, "trickplay")
 
     return True
 
 
 def delete_directories(video):
     """
-    Remove all generated directories for a video.
+    Remove all generated directories for a video and forget its checkpoints.
+
+    original/ is kept: chunked uploads are written there directly, and
+    the video can only be converted again while its original exists.
     """
     video_root = MEDIA_ROOT / "videos" / f"video_{video.id}"
-    if video_root.exists():
-        shutil.rmtree(video_root)
+    for directory in GENERATED_DIRECTORIES:
+        shutil.rmtree(video_root / directory, ignore_errors=True)
+    video.checkpoints.all().delete()
 
 
 def move_original(video):
     """
     Move the original uploaded video file into its final directory.
+
+    The file is renamed in place when source and target share a
+    filesystem and only streamed across filesystem boundaries.
     """
     source_path = Path(video.original_file.path)
 
@@ -175,10 +844,33 @@ def move_original(video):
 
     target_path = target_dir / source_path.name
 
-    shutil.copy2(source_path, target_path)
-    source_path.unlink()
+    # Chunked uploads and retried conversions are already in place
+    if source_path != target_path:
+        try:
+            os.replace(source_path, target_path)
+        except OSError as error:
+            if error.errno != errno.EXDEV:
+                raise
+            stream_file(source_path, target_path)
 
     video.original_file.name = (
         f"videos/video_{video.id}/original/{source_path.name}"
     )
     video.save(update_fields=["original_file"])
+
+
+def stream_file(source_path, target_path):
+    """
+    Move a file across filesystems by streaming it in fixed-size blocks.
+
+    The copy is written next to the target and renamed into place, so
+    the target never exists half-written.
+    """
+    temporary_path = target_path.with_name(f".{target_path.name}.tmp")
+
+    with source_path.open("rb") as source, temporary_path.open("wb") as target:
+        shutil.copyfileobj(source, target, COPY_BUFFER_SIZE)
+    shutil.copystat(source_path, temporary_path)
+
+    os.replace(temporary_path, target_path)
+    source_path.unlink()
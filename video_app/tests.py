@@ -1,3 +1,246 @@
-from django.test import TestCase
+"""
+Tests for signed URLs, byte ranges, cursor pagination and the list cache.
+"""
 
-# Create your tests here.
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from unittest import mock
+from urllib.parse import parse_qs, urlparse
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from video_app.api.pagination import VideoCursorPagination
+from video_app.models import Video
+from video_app.utils import list_cache
+from video_app.utils.byte_ranges import parse_range_header, ranged_file_response
+from video_app.utils.signed_urls import (
+    sign_playlist,
+    signed_query,
+    verify_signed_request,
+)
+
+
+@override_settings(VIDEO_SEGMENT_URL_TTL=600)
+class SignedUrlTests(SimpleTestCase):
+    """
+    Signing and verification of segment URLs.
+    """
+
+    now = 1_000_000
+
+    def signed_params(self, movie_id=1, resolution="720p"):
+        query = signed_query(movie_id, resolution, now=self.now)
+        return {key: values[0] for key, values in parse_qs(query).items()}
+
+    def test_valid_signature_is_accepted_until_expiry(self):
+        params = self.signed_params()
+        expires = int(params["expires"])
+
+        self.assertGreaterEqual(expires, self.now + 600)
+        self.assertEqual(
+            verify_signed_request(params, 1, "720p", now=self.now), expires
+        )
+        self.assertEqual(verify_signed_request(params, 1, "720p", now=expires), expires)
+
+    def test_expired_signature_is_rejected(self):
+        params = self.signed_params()
+
+        self.assertIsNone(
+            verify_signed_request(params, 1, "720p", now=int(params["expires"]) + 1)
+        )
+
+    def test_tampered_signature_is_rejected(self):
+        params = self.signed_params()
+        params["signature"] = params["signature"][:-1] + (
+            "0" if params["signature"][-1] != "0" else "1"
+        )
+
+        self.assertIsNone(verify_signed_request(params, 1, "720p", now=self.now))
+
+    def test_extended_expiry_is_rejected(self):
+        params = self.signed_params()
+        params["expires"] = str(int(params["expires"]) + 3600)
+
+        self.assertIsNone(verify_signed_request(params, 1, "720p", now=self.now))
+
+    def test_signature_is_scoped_to_video_and_resolution(self):
+        params = self.signed_params(movie_id=1, resolution="720p")
+
+        self.assertIsNone(verify_signed_request(params, 1, "1080p", now=self.now))
+        self.assertIsNone(verify_signed_request(params, 2, "720p", now=self.now))
+
+    def test_missing_or_malformed_parameters_are_rejected(self):
+        self.assertIsNone(verify_signed_request({}, 1, "720p", now=self.now))
+        self.assertIsNone(
+            verify_signed_request(
+                {"expires": "soon", "signature": "x"}, 1, "720p", now=self.now
+            )
+        )
+
+    def test_playlist_uris_get_the_query(self):
+        playlist = '#EXTM3U\n#EXT-X-MAP:URI="init.mp4"\n#EXTINF:4.0,\nindex0.m4s\n'
+
+        signed = sign_playlist(playlist, "expires=1&signature=abc")
+
+        self.assertIn('URI="init.mp4/?expires=1&signature=abc"', signed)
+        self.assertIn("\nindex0.m4s/?expires=1&signature=abc\n", signed)
+        self.assertIn("#EXTINF:4.0,\n", signed)
+
+
+class ByteRangeTests(SimpleTestCase):
+    """
+    Parsing of Range headers and ranged file responses.
+    """
+
+    def test_bounded_range(self):
+        self.assertEqual(parse_range_header("bytes=0-9", 100), (0, 9))
+
+    def test_bounded_range_is_clipped_to_the_size(self):
+        self.assertEqual(parse_range_header("bytes=90-200", 100), (90, 99))
+
+    def test_open_ended_range(self):
+        self.assertEqual(parse_range_header("bytes=40-", 100), (40, 99))
+
+    def test_suffix_range(self):
+        self.assertEqual(parse_range_header("bytes=-10", 100), (90, 99))
+        self.assertEqual(parse_range_header("bytes=-500", 100), (0, 99))
+
+    def test_multi_range_serves_the_whole_file(self):
+        self.assertIsNone(parse_range_header("bytes=0-9,20-29", 100))
+
+    def test_missing_or_invalid_range_serves_the_whole_file(self):
+        self.assertIsNone(parse_range_header(None, 100))
+        self.assertIsNone(parse_range_header("bytes=-", 100))
+        self.assertIsNone(parse_range_header("items=0-9", 100))
+        self.assertIsNone(parse_range_header("bytes=5-2", 100))
+
+    def test_unsatisfiable_ranges(self):
+        for header, size in [("bytes=100-", 100), ("bytes=150-160", 100)]:
+            with self.subTest(header=header):
+                with self.assertRaises(ValueError):
+                    parse_range_header(header, size)
+
+        for header, size in [("bytes=-0", 100), ("bytes=-10", 0)]:
+            with self.subTest(header=header, size=size):
+                with self.assertRaises(ValueError):
+                    parse_range_header(header, size)
+
+    def test_ranged_file_response(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "segment.ts"
+            path.write_bytes(bytes(range(100)))
+
+            response = ranged_file_response(path, "video/mp2t", "bytes=10-19")
+            self.assertEqual(response.status_code, 206)
+            self.assertEqual(response["Content-Range"], "bytes 10-19/100")
+            self.assertEqual(b"".join(response.streaming_content), bytes(range(10, 20)))
+
+            response = ranged_file_response(path, "video/mp2t", "bytes=5-2")
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(b"".join(response.streaming_content), bytes(range(100)))
+
+            response = ranged_file_response(path, "video/mp2t", "bytes=100-")
+            self.assertEqual(response.status_code, 416)
+            self.assertEqual(response["Content-Range"], "bytes */100")
+
+
+class CursorPaginationTests(TestCase):
+    """
+    Keyset pagination of the video list.
+    """
+
+    def paginate(self, params):
+        paginator = VideoCursorPagination()
+        request = Request(APIRequestFactory().get("/api/video/", params))
+        queryset = Video.objects.values("id", "created_at")
+        page = paginator.paginate_queryset(queryset, request)
+        if page is None:
+            return None, None
+        return page, paginator.get_next_link()
+
+    def test_cursor_round_trip(self):
+        paginator = VideoCursorPagination()
+        created_at = datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+
+        cursor = paginator.encode_cursor(created_at, 42)
+
+        self.assertNotIn("=", cursor)
+        self.assertEqual(paginator.decode_cursor(cursor), (created_at, 42))
+
+    def test_invalid_cursor_is_not_found(self):
+        for cursor in ["not-a-cursor", "", "bm9waXBl"]:
+            with self.subTest(cursor=cursor):
+                with self.assertRaises(NotFound):
+                    VideoCursorPagination().decode_cursor(cursor)
+
+    def test_requests_without_parameters_are_not_paginated(self):
+        page, _ = self.paginate({})
+
+        self.assertIsNone(page)
+
+    def test_equal_created_at_is_tie_broken_by_id(self):
+        ids = [
+            Video.objects.create(title=f"v{index}", description="d", category="drama").id
+            for index in range(5)
+        ]
+        Video.objects.update(
+            created_at=datetime(2024, 1, 1, tzinfo=timezone.utc)
+        )
+
+        seen = []
+        params = {"page_size": 2}
+        while True:
+            page, next_link = self.paginate(params)
+            seen += [row["id"] for row in page]
+            if next_link is None:
+                break
+            params = {
+                key: values[0]
+                for key, values in parse_qs(urlparse(next_link).query).items()
+            }
+
+        self.assertEqual(seen, sorted(ids, reverse=True))
+
+
+class ListCacheTests(TestCase):
+    """
+    Rebuild lock of the cached video list.
+    """
+
+    key = "video_list:test:tests"
+
+    def tearDown(self):
+        cache.delete_many([self.key, f"{self.key}:lock"])
+
+    def test_lock_holder_builds_and_releases_the_lock(self):
+        body, etag = list_cache.rebuild(self.key, lambda: b"[]")
+
+        self.assertEqual(body, b"[]")
+        self.assertEqual(cache.get(self.key), (body, etag))
+        self.assertIsNone(cache.get(f"{self.key}:lock"))
+
+    def test_waiting_request_uses_the_lock_holders_result(self):
+        cache.add(f"{self.key}:lock", True, 10)
+        build = mock.Mock(return_value=b"[1]")
+
+        def sleep(seconds):
+            list_cache.store(self.key, b"[2]")
+
+        with mock.patch.object(list_cache.time, "sleep", sleep):
+            body, _ = list_cache.rebuild(self.key, build)
+
+        self.assertEqual(body, b"[2]")
+        build.assert_not_called()
+
+    @override_settings(VIDEO_LIST_LOCK_TIMEOUT=0)
+    def test_waiting_request_builds_after_the_lock_timeout(self):
+        cache.add(f"{self.key}:lock", True, 10)
+
+        body, _ = list_cache.rebuild(self.key, lambda: b"[3]")
+
+        self.assertEqual(body, b"[3]")
@@ -0,0 +1,144 @@
+"""
+Utilities for serving files with HTTP Range support.
+
+Only single byte ranges are honoured. Multi-range requests are
+answered with the full file, which RFC 9110 allows.
+"""
+
+import asyncio
+import re
+
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+
+# Block size used when streaming a requested byte range
+RANGE_BLOCK_SIZE = 64 * 1024
+
+RANGE_PATTERN = re.compile(r"bytes=(\d*)-(\d*)")
+
+
+def parse_range_header(header, size):
+    """
+    Return the inclusive (start, end) positions requested by a Range header.
+
+    Returns None if the whole file should be served, including for
+    invalid ranges whose last position precedes the first, and raises a
+    ValueError if the range cannot be satisfied for a file of `size` bytes.
+    """
+    match = RANGE_PATTERN.fullmatch((header or "").strip())
+    if not match or match.group(1) == match.group(2) == "":
+        return None
+
+    first, last = match.groups()
+    if first == "":
+        length = int(last)
+        if length == 0 or size == 0:
+            raise ValueError("Empty suffix range")
+        return max(size - length, 0), size - 1
+
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise ValueError("Unsatisfiable range")
+    end = min(int(last), size - 1) if last else size - 1
+    return start, end
+
+
+def ranged_file_response(
+    path, content_type, range_header=None, size=None, asynchronous=False
+):
+    """
+    Serve a file in full or, for a Range request, the requested bytes.
+
+    With `asynchronous` the body is an async iterator, so ASGI servers
+    stream it without tying up a thread per connection.
+    """
+    if size is None:
+        size = path.stat().st_size
+
+    try:
+        byte_range = parse_range_header(range_header, size)
+    except ValueError:
+        return unsatisfiable_response(size)
+
+    reader = aread_range if asynchronous else read_range
+
+    if byte_range is None and asynchronous:
+        response = StreamingHttpResponse(
+            reader(path, 0, size), content_type=content_type
+        )
+        response["Content-Length"] = str(size)
+    elif byte_range is None:
+        response = FileResponse(path.open("rb"), content_type=content_type)
+    else:
+        start, end = byte_range
+        response = StreamingHttpResponse(
+            reader(path, start, end - start + 1),
+            status=206,
+            content_type=content_type,
+        )
+        response["Content-Length"] = str(end - start + 1)
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+
+    response["Accept-Ranges"] = "bytes"
+    return response
+
+
+def ranged_content_response(content, content_type):
+    """
+    Serve in-memory bytes in full.
+
+    Range requests are answered from the file by ranged_file_response,
+    the response only advertises that they are supported.
+    """
+    response = HttpResponse(content, content_type=content_type)
+    response["Content-Length"] = str(len(content))
+    response["Accept-Ranges"] = "bytes"
+    return response
+
+
+def unsatisfiable_response(size):
+    """
+    Return the 416 response for a range outside a body of `size` bytes.
+    """
+    response = HttpResponse(status=416)
+    response["Content-Range"] = f"bytes */{size}"
+    return response
+
+
+def read_range(path, start, length):
+    """
+    Yield `length` bytes of a file starting at `start` in blocks.
+    """
+    with path.open("rb") as file:
+        file.seek(start)
+        remaining = length
+        while remaining > 0:
+            block = file.read(min(RANGE_BLOCK_SIZE, remaining))
+            if not block:
+                break
+            remaining -= len(block)
+            yield block
+
+
+async def aread_range(path, start, length):
+    """
+    Asynchronously yield `length` bytes of a file starting at `start`.
+
+    Disk reads run in the default thread pool, so a slow disk never
+    blocks the event loop.
+    """
+    file = await asyncio.to_thread(path.open, "rb")
+    try:
+        await asyncio.to_thread(file.seek, start)
+        remaining = length
+        while remaining > 0:
+            block = await asyncio.to_thread(
+                file.read, min(RANGE_BLOCK_SIZE, remaining)
+            )
+            if not block:
+                break
+            remaining -= len(block)
+            yield block
+    finally:
+        file.close()
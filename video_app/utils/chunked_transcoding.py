@@ -0,0 +1,162 @@
+"""
+Utilities for chunked, segment-parallel HLS transcoding.
+
+Splits a source video at keyframes into time ranges, transcodes
+the ranges concurrently in a process pool and stitches the chunk
+playlists into one continuous HLS playlist per rendition.
+"""
+
+import logging
+import math
+import os
+import shutil
+import subprocess
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from .ffprobe import probe_duration, probe_keyframes
+from .hls import extinf_duration, read_playlist_entries
+
+logger = logging.getLogger(__name__)
+
+
+def transcode_in_chunks(
+    source_path,
+    targets,
+    work_dir,
+    build_command,
+    chunk_seconds,
+    workers=None,
+    duration=None,
+    progress_callback=None,
+):
+    """
+    Transcode `targets` chunk by chunk and stitch the results.
+
+    `targets` maps a resolution key to its final playlist path and
+    `build_command(source_path, targets, start, duration)` returns the
+    ffmpeg command for one chunk. The source duration is probed unless
+    it is already known. `progress_callback(finished, total)` is called
+    whenever a chunk ends. Returns True if every chunk succeeded, and
+    False if probing or any chunk failed.
+    """
+    work_dir = Path(work_dir)
+    try:
+        duration = duration or probe_duration(source_path)
+        keyframes = probe_keyframes(source_path)
+    except (OSError, subprocess.CalledProcessError, ValueError):
+        logger.error("FFprobe failed to plan chunks of %s", source_path)
+        return False
+    chunks = plan_chunks(keyframes, duration, chunk_seconds)
+
+    commands = []
+    chunk_targets = []
+    for index, (start, length) in enumerate(chunks):
+        targets_for_chunk = {}
+        for resolution in targets:
+            chunk_dir = work_dir / f"chunk_{index}" / f"{resolution}p"
+            chunk_dir.mkdir(parents=True, exist_ok=True)
+            targets_for_chunk[resolution] = chunk_dir / "index.m3u8"
+        chunk_targets.append(targets_for_chunk)
+        commands.append(
+            build_command(source_path, targets_for_chunk, start, length)
+        )
+
+    workers = workers or available_cores()
+    logger.info(
+        "---> Transcoding %s chunks with %s workers", len(commands), workers
+    )
+
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(run_command, cmd) for cmd in commands]
+        for future in as_completed(futures):
+            results.append(future.result())
+            if progress_callback:
+                progress_callback(len(results), len(futures))
+
+    if not all(results):
+        shutil.rmtree(work_dir, ignore_errors=True)
+        return False
+
+    for resolution, target_path in targets.items():
+        stitch_playlists(
+            [targets_for_chunk[resolution] for targets_for_chunk in chunk_targets],
+            Path(target_path),
+        )
+
+    shutil.rmtree(work_dir, ignore_errors=True)
+    return True
+
+
+def plan_chunks(keyframes, duration, chunk_seconds):
+    """
+    Return (start, duration) ranges cut at the first keyframe after
+    every `chunk_seconds` interval.
+    """
+    boundaries = [0.0]
+    for timestamp in keyframes:
+        if timestamp - boundaries[-1] >= chunk_seconds and timestamp < duration:
+            boundaries.append(timestamp)
+    boundaries.append(duration)
+
+    return [
+        (start, end - start) for start, end in zip(boundaries, boundaries[1:])
+    ]
+
+
+def stitch_playlists(chunk_playlists, target_path):
+    """
+    Merge chunk playlists into one playlist with continuous numbering.
+
+    Segments are moved next to `target_path` and renamed to
+    index<n>.ts in playback order.
+    """
+    target_dir = target_path.parent
+    target_dir.mkdir(parents=True, exist_ok=True)
+
+    entries = []
+    for playlist_path in chunk_playlists:
+        for extinf, segment_name in read_playlist_entries(playlist_path):
+            number = len(entries)
+            segment_path = playlist_path.parent / segment_name
+            segment_path.replace(target_dir / f"index{number}.ts")
+            entries.append((extinf, f"index{number}.ts"))
+
+    target_duration = max(
+        (math.ceil(extinf_duration(extinf)) for extinf, _ in entries),
+        default=0,
+    )
+
+    lines = [
+        "#EXTM3U",
+        "#EXT-X-VERSION:6",
+        "#EXT-X-INDEPENDENT-SEGMENTS",
+        f"#EXT-X-TARGETDURATION:{target_duration}",
+        "#EXT-X-MEDIA-SEQUENCE:0",
+    ]
+    for extinf, segment_name in entries:
+        lines += [extinf, segment_name]
+    lines.append("#EXT-X-ENDLIST")
+
+    target_path.write_text("\n".join(lines) + "\n")
+
+
+def run_command(cmd):
+    """
+    Run a single chunk command in a pool worker.
+    """
+    result = subprocess.run(cmd, capture_output=True)
+    if result.returncode != 0:
+        logger.error("FFmpeg chunk failed: %s", " ".join(cmd))
+        return False
+    return True
+
+
+def available_cores():
+    """
+    Return the number of CPU cores usable by this process.
+    """
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
@@ -0,0 +1,154 @@
+"""
+Utilities for delivering media files to clients.
+
+Depending on VIDEO_DELIVERY_MODE a file is either streamed by Django
+or handed off to the reverse proxy with an internal-redirect header,
+so the worker is free again as soon as the request is authorized.
+Files streamed by Django carry strong validators, so conditional
+requests are answered with 304 Not Modified.
+"""
+
+import hashlib
+from pathlib import Path
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+
+from .byte_ranges import ranged_content_response, ranged_file_response
+
+MEDIA_ROOT = Path(settings.MEDIA_ROOT)
+
+
+def media_response(
+    request,
+    path,
+    content_type,
+    cache_control,
+    asynchronous=False,
+    entry=None,
+    load_content=None,
+):
+    """
+    Return a response delivering a file below MEDIA_ROOT.
+
+    "nginx" sets X-Accel-Redirect to the file below
+    VIDEO_ACCEL_REDIRECT_PREFIX, "sendfile" sets X-Sendfile to the
+    absolute path, and the proxy takes care of validators, conditional
+    and Range requests. Any other mode serves the file from Django,
+    as an async stream for async views. `entry` is the file's manifest
+    index entry, if known, and `load_content` a callable returning the
+    file's bytes from memory, or None to stream the file.
+    """
+    mode = settings.VIDEO_DELIVERY_MODE
+
+    if mode == "nginx":
+        response = HttpResponse(content_type=content_type)
+        response["X-Accel-Redirect"] = accel_redirect_uri(path)
+    elif mode == "sendfile":
+        response = HttpResponse(content_type=content_type)
+        response["X-Sendfile"] = str(Path(path).resolve())
+    else:
+        response = file_response(
+            request, path, content_type, asynchronous, entry, load_content
+        )
+
+    response["Cache-Control"] = cache_control
+    return response
+
+
+def file_response(
+    request, path, content_type, asynchronous=False, entry=None, load_content=None
+):
+    """
+    Serve a file from Django with an ETag and Last-Modified.
+
+    Conditional requests are answered with 304 or 412, and a Range is
+    only honoured if a given If-Range still matches the file. With a
+    manifest index `entry` ([size, mtime_ns, hash]) the validators come
+    from the index instead of a stat call, and the ETag is the content
+    hash. `load_content` is only called when the whole file is sent,
+    so 304s and Range requests never pull the file into memory; if it
+    returns bytes, the body is served from them.
+    """
+    if entry is None:
+        stat = path.stat()
+        size = stat.st_size
+        etag = file_etag(stat)
+        last_modified = int(stat.st_mtime)
+    else:
+        size, mtime_ns, content_hash = entry
+        etag = f'"{content_hash}"'
+        last_modified = mtime_ns // 1_000_000_000
+
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified
+    )
+    if response is None:
+        range_header = request.headers.get("Range")
+        if not if_range_matches(request.headers.get("If-Range"), etag, last_modified):
+            range_header = None
+        content = None
+        if load_content is not None and range_header is None:
+            content = load_content()
+        if content is not None:
+            response = ranged_content_response(content, content_type)
+        else:
+            response = ranged_file_response(
+                path, content_type, range_header, size, asynchronous
+            )
+
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified)
+    return response
+
+
+def content_response(request, content, content_type, cache_control, etag=None):
+    """
+    Serve generated text or bytes with an ETag derived from its content.
+
+    A precomputed `etag` of cached content skips hashing the body.
+    """
+    body = content.encode() if isinstance(content, str) else content
+    if etag is None:
+        etag = f'"{hashlib.md5(body, usedforsecurity=False).hexdigest()}"'
+
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = HttpResponse(body, content_type=content_type)
+
+    response["ETag"] = etag
+    response["Cache-Control"] = cache_control
+    return response
+
+
+def file_etag(stat):
+    """
+    Return a strong ETag built from a file's size and modification time.
+
+    Media files are only ever replaced by an atomic rename, so the
+    pair changes whenever the content does.
+    """
+    return f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+
+
+def if_range_matches(if_range, etag, last_modified):
+    """
+    Return whether a Range may be applied given an If-Range header.
+    """
+    if not if_range:
+        return True
+    if if_range.startswith('"'):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == last_modified
+
+
+def accel_redirect_uri(path):
+    """
+    Return the internal nginx URI of a file below MEDIA_ROOT.
+    """
+    relative_path = Path(path).relative_to(MEDIA_ROOT).as_posix()
+    prefix = settings.VIDEO_ACCEL_REDIRECT_PREFIX.rstrip("/")
+    return quote(f"{prefix}/{relative_path}")
@@ -0,0 +1,140 @@
+"""
+Utilities for analysing source videos with ffprobe.
+"""
+
+import json
+import subprocess
+
+
+def probe_source(source_path):
+    """
+    Return the stream properties of a video relevant for transcoding.
+
+    Reads width, height, codecs, frame rate, duration and bitrate
+    from the container and its first video and audio streams.
+    """
+    cmd = [
+        "ffprobe",
+        "-v",
+        "error",
+        "-show_format",
+        "-show_streams",
+        "-of",
+        "json",
+        str(source_path),
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+    data = json.loads(result.stdout)
+
+    streams = data.get("streams", [])
+    video_stream = next(
+        (stream for stream in streams if stream.get("codec_type") == "video"), {}
+    )
+    audio_stream = next(
+        (stream for stream in streams if stream.get("codec_type") == "audio"), {}
+    )
+    container = data.get("format", {})
+
+    return {
+        "width": video_stream.get("width"),
+        "height": video_stream.get("height"),
+        "duration": parse_number(container.get("duration"), float),
+        "video_codec": video_stream.get("codec_name", ""),
+        "audio_codec": audio_stream.get("codec_name", ""),
+        "frame_rate": parse_frame_rate(video_stream.get("avg_frame_rate")),
+        "bitrate": parse_number(container.get("bit_rate"), int),
+    }
+
+
+def probe_video_stream(source_path):
+    """
+    Return the codec profile and level of the first video stream.
+    """
+    cmd = [
+        "ffprobe",
+        "-v",
+        "error",
+        "-select_streams",
+        "v:0",
+        "-show_entries",
+        "stream=profile,level",
+        "-of",
+        "json",
+        str(source_path),
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+    streams = json.loads(result.stdout).get("streams") or [{}]
+    return streams[0].get("profile", ""), streams[0].get("level", 0)
+
+
+def probe_keyframes(source_path):
+    """
+    Return the sorted presentation timestamps of all video keyframes.
+
+    Only packet flags are read, so no frame has to be decoded.
+    """
+    cmd = [
+        "ffprobe",
+        "-v",
+        "error",
+        "-select_streams",
+        "v:0",
+        "-show_entries",
+        "packet=pts_time,flags",
+        "-of",
+        "csv=p=0",
+        str(source_path),
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+
+    keyframes = []
+    for line in result.stdout.splitlines():
+        pts_time, _, flags = line.partition(",")
+        if "K" in flags and pts_time not in ("", "N/A"):
+            keyframes.append(float(pts_time))
+    return sorted(keyframes)
+
+
+def probe_duration(source_path):
+    """
+    Return the container duration of a video in seconds.
+    """
+    cmd = [
+        "ffprobe",
+        "-v",
+        "error",
+        "-show_entries",
+        "format=duration",
+        "-of",
+        "csv=p=0",
+        str(source_path),
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+    return float(result.stdout.strip())
+
+
+def parse_frame_rate(value):
+    """
+    Convert an ffprobe rational such as "30000/1001" to frames per second.
+    """
+    if not value:
+        return None
+    numerator, _, denominator = value.partition("/")
+    try:
+        numerator = float(numerator)
+        denominator = float(denominator or 1)
+    except ValueError:
+        return None
+    if not numerator or not denominator:
+        return None
+    return round(numerator / denominator, 3)
+
+
+def parse_number(value, cast):
+    """
+    Convert an ffprobe value to a number, returning None if unavailable.
+    """
+    try:
+        return cast(float(value))
+    except (TypeError, ValueError):
+        return None
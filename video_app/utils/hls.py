@@ -0,0 +1,132 @@
+"""
+Utilities for reading and writing HLS playlists.
+"""
+
+import math
+from pathlib import Path
+
+# RFC 6381 profile and constraint bytes of the H.264 profiles ffmpeg reports
+AVC_PROFILES = {
+    "Constrained Baseline": "42e0",
+    "Baseline": "4200",
+    "Main": "4d40",
+    "High": "6400",
+}
+
+AAC_LC_CODEC = "mp4a.40.2"
+
+
+def read_playlist_entries(playlist_path):
+    """
+    Return (#EXTINF line, segment name) pairs of a media playlist.
+    """
+    entries = []
+    extinf = None
+    for line in Path(playlist_path).read_text().splitlines():
+        line = line.strip()
+        if line.startswith("#EXTINF:"):
+            extinf = line
+        elif line and not line.startswith("#") and extinf:
+            entries.append((extinf, line))
+            extinf = None
+    return entries
+
+
+def extinf_duration(extinf):
+    """
+    Return the segment duration in seconds of an #EXTINF line.
+    """
+    return float(extinf[len("#EXTINF:"):].split(",")[0])
+
+
+def read_segment_sizes(playlist_path):
+    """
+    Return (duration, size in bytes) pairs of the segments of a playlist.
+
+    Segments addressed by #EXT-X-BYTERANGE take the range length as
+    their size, other segments the size of their file.
+    """
+    playlist_path = Path(playlist_path)
+    segments = []
+    duration = None
+    byterange_length = None
+    for line in playlist_path.read_text().splitlines():
+        line = line.strip()
+        if line.startswith("#EXTINF:"):
+            duration = extinf_duration(line)
+        elif line.startswith("#EXT-X-BYTERANGE:"):
+            byterange_length = int(line[len("#EXT-X-BYTERANGE:"):].split("@")[0])
+        elif line and not line.startswith("#") and duration is not None:
+            size = byterange_length
+            if size is None:
+                size = (playlist_path.parent / line).stat().st_size
+            segments.append((duration, size))
+            duration = None
+            byterange_length = None
+    return segments
+
+
+def measure_bandwidth(playlist_path):
+    """
+    Return the peak and average bitrate in bits per second of a rendition.
+
+    The peak is the highest bitrate of any single segment, as required
+    for the BANDWIDTH attribute of a master playlist.
+    """
+    peak = 0
+    total_bits = 0
+    total_duration = 0.0
+
+    for duration, size in read_segment_sizes(playlist_path):
+        bits = size * 8
+        total_bits += bits
+        total_duration += duration
+        if duration > 0:
+            peak = max(peak, math.ceil(bits / duration))
+
+    average = math.ceil(total_bits / total_duration) if total_duration else 0
+    return peak, average
+
+
+def avc_codec_string(profile, level):
+    """
+    Build the RFC 6381 codec string of an H.264 stream, e.g. avc1.4d401f.
+    """
+    profile_bytes = AVC_PROFILES.get(profile, AVC_PROFILES["Main"])
+    return f"avc1.{profile_bytes}{int(level):02x}"
+
+
+def write_master_playlist(master_path, variants):
+    """
+    Write a master playlist referencing every rendition.
+
+    `variants` is a list of dicts with `uri`, `bandwidth`,
+    `average_bandwidth`, `resolution` and `codecs` keys, written
+    in ascending bandwidth order.
+    """
+    lines = [
+        "#EXTM3U",
+        "#EXT-X-VERSION:3",
+        "#EXT-X-INDEPENDENT-SEGMENTS",
+    ]
+    for variant in sorted(variants, key=lambda variant: variant["bandwidth"]):
+        lines += [
+            "#EXT-X-STREAM-INF:"
+            f"BANDWIDTH={variant['bandwidth']},"
+            f"AVERAGE-BANDWIDTH={variant['average_bandwidth']},"
+            f"RESOLUTION={variant['resolution']},"
+            f'CODECS="{variant["codecs"]}"',
+            variant["uri"],
+        ]
+
+    write_atomic(master_path, "\n".join(lines) + "\n")
+
+
+def write_atomic(path, content):
+    """
+    Write a text file via a temporary sibling and an atomic rename.
+    """
+    path = Path(path)
+    temporary_path = path.with_name(f".{path.name}.tmp")
+    temporary_path.write_text(content)
+    temporary_path.replace(path)
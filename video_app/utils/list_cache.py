@@ -0,0 +1,101 @@
+"""
+Redis cache of rendered video list responses.
+
+The list of ready videos only changes when a video is saved or
+deleted, so its rendered JSON is cached per URL together with an ETag.
+Saving or deleting a video bumps a version number that is part of
+every key, which invalidates all pages at once and keeps rebuilds that
+started before the change from overwriting newer entries. The
+category rows of the dashboard are cached the same way.
+
+When a new release goes live, all dashboards miss at the same time.
+Only the request holding the rebuild lock renders the list; the others
+wait for its result instead of running the same query concurrently.
+"""
+
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+# Seconds between checks of requests waiting for a rebuild
+LOCK_POLL_INTERVAL = 0.05
+
+
+def cached_list(request, build):
+    """
+    Return the (body, etag) of a list response, calling `build` on a miss.
+
+    `build` returns the rendered response body as bytes.
+    """
+    key = list_key(request)
+    cached = cache.get(key)
+    if cached is None:
+        cached = rebuild(key, build)
+    return cached
+
+
+def rebuild(key, build):
+    """
+    Render and cache a list response unless another request already does.
+
+    Waiting requests give up after VIDEO_LIST_LOCK_TIMEOUT seconds and
+    render the list themselves, so a crashed lock holder costs latency
+    but never fails a request.
+    """
+    lock_key = f"{key}:lock"
+    if cache.add(lock_key, True, settings.VIDEO_LIST_LOCK_TIMEOUT):
+        try:
+            return store(key, build())
+        finally:
+            cache.delete(lock_key)
+
+    deadline = time.monotonic() + settings.VIDEO_LIST_LOCK_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(LOCK_POLL_INTERVAL)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    return store(key, build())
+
+
+def store(key, body):
+    """
+    Cache a rendered list body with its ETag and return both.
+    """
+    cached = (body, f'"{hashlib.md5(body, usedforsecurity=False).hexdigest()}"')
+    cache.set(key, cached, settings.VIDEO_LIST_CACHE_TIMEOUT)
+    return cached
+
+
+def invalidate_video_list():
+    """
+    Invalidate every cached list response.
+    """
+    try:
+        cache.incr(version_key())
+    except ValueError:
+        cache.set(version_key(), 1, None)
+
+
+def list_key(request):
+    """
+    Return the cache key of a list URL under the current version.
+
+    The scheme and host are part of the key, as the response contains
+    absolute thumbnail URLs.
+    """
+    version = cache.get_or_set(version_key(), 1, None)
+    url = hashlib.md5(
+        request.build_absolute_uri().encode(), usedforsecurity=False
+    ).hexdigest()
+    return f"video_list:{version}:{url}"
+
+
+def version_key():
+    """
+    Return the cache key of the list version.
+    """
+    return "video_list_version"
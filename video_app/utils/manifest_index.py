@@ -0,0 +1,105 @@
+"""
+Utilities for the per-video manifest index.
+
+When a video is published, every file of its processed directory is
+recorded with size, modification time and content hash. Delivery
+views resolve requested playlists and segments against this index, so
+unknown names are rejected without touching the filesystem, and the
+validators of known files come from memory instead of a stat call.
+
+The index is stored on the video and cached in a per-process LRU in
+front of Redis, like the ready-video cache.
+"""
+
+import hashlib
+import os
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache
+
+from video_app.models import Video
+from .ready_cache import LocalTTLCache
+
+# Key of the files directly inside the processed directory
+ROOT_KEY = ""
+
+# Block size used when hashing published files
+HASH_BLOCK_SIZE = 1024 * 1024
+
+local_cache = LocalTTLCache(
+    settings.VIDEO_MANIFEST_LOCAL_SIZE, settings.VIDEO_MANIFEST_LOCAL_TTL
+)
+
+
+def build_manifest_index(processed_root):
+    """
+    Return {directory: {file name: [size, mtime_ns, hash]}} of a
+    processed directory, with ROOT_KEY for the master playlist.
+    """
+    processed_root = Path(processed_root)
+    index = {}
+    for directory, _, filenames in os.walk(processed_root):
+        relative = Path(directory).relative_to(processed_root).as_posix()
+        key = ROOT_KEY if relative == "." else relative
+        entries = {}
+        for filename in filenames:
+            path = Path(directory) / filename
+            stat = path.stat()
+            entries[filename] = [stat.st_size, stat.st_mtime_ns, file_hash(path)]
+        index[key] = entries
+    return index
+
+
+def file_hash(path):
+    """
+    Return a short BLAKE2 content hash of a file.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as file:
+        while block := file.read(HASH_BLOCK_SIZE):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def get_manifest_index(video_id):
+    """
+    Return the manifest index of a video, or an empty dict if it has none.
+    """
+    found, index = local_cache.get(video_id)
+    if found:
+        return index
+
+    index = cache.get(manifest_key(video_id))
+    if index is None:
+        index = (
+            Video.objects.filter(id=video_id)
+            .values_list("manifest_index", flat=True)
+            .first()
+        ) or {}
+        cache.set(manifest_key(video_id), index, settings.VIDEO_READY_CACHE_TIMEOUT)
+
+    local_cache.set(video_id, index)
+    return index
+
+
+def lookup_file(video_id, directory, filename):
+    """
+    Return the [size, mtime_ns, hash] entry of a published file, or None.
+    """
+    return get_manifest_index(video_id).get(directory, {}).get(filename)
+
+
+def invalidate_manifest_index(video_id):
+    """
+    Drop the cached manifest index of a video from both tiers.
+    """
+    local_cache.delete(video_id)
+    cache.delete(manifest_key(video_id))
+
+
+def manifest_key(video_id):
+    """
+    Return the cache key holding the manifest index of a video.
+    """
+    return f"video_manifest:{video_id}"
@@ -0,0 +1,147 @@
+"""
+Utilities for running ffmpeg with streamed progress reporting.
+
+ffmpeg's machine-readable progress output is read line by line and
+published per video and stage to Redis, where the progress API reads it.
+"""
+
+import json
+import subprocess
+import threading
+import time
+from collections import deque
+
+from django.core.cache import cache
+from django_redis import get_redis_connection
+
+# Keep progress around for a day after the last update
+PROGRESS_TIMEOUT = 60 * 60 * 24
+
+# Number of stderr lines kept for error logging
+STDERR_TAIL_LINES = 50
+
+
+def run_ffmpeg(cmd, video_id, stage, duration=None):
+    """
+    Run an ffmpeg command while publishing its progress.
+
+    Returns the exit code and the last lines written to stderr.
+    Memory use is bounded regardless of how long ffmpeg runs.
+    """
+    cmd = [cmd[0], "-progress", "pipe:1", "-nostats", *cmd[1:]]
+    publish_progress(video_id, stage, state="running", percent=0.0)
+
+    process = subprocess.Popen(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        errors="replace",
+    )
+
+    stderr_tail = deque(maxlen=STDERR_TAIL_LINES)
+    stderr_reader = threading.Thread(
+        target=stderr_tail.extend, args=(process.stderr,), daemon=True
+    )
+    stderr_reader.start()
+
+    block = {}
+    for line in process.stdout:
+        key, _, value = line.strip().partition("=")
+        block[key] = value
+        if key == "progress":
+            publish_block(video_id, stage, block, duration)
+            block = {}
+
+    returncode = process.wait()
+    stderr_reader.join()
+
+    publish_progress(
+        video_id,
+        stage,
+        state="done" if returncode == 0 else "failed",
+        percent=100.0 if returncode == 0 else None,
+    )
+
+    return returncode, "".join(stderr_tail)
+
+
+def publish_block(video_id, stage, block, duration):
+    """
+    Publish one block of ffmpeg progress output.
+    """
+    out_time = parse_out_time(block)
+    speed = parse_speed(block.get("speed"))
+
+    percent = None
+    eta = None
+    if duration and out_time is not None:
+        percent = round(min(out_time / duration, 1.0) * 100, 1)
+        if speed:
+            eta = round(max(duration - out_time, 0.0) / speed, 1)
+
+    publish_progress(
+        video_id, stage, state="running", percent=percent, speed=speed, eta=eta
+    )
+
+
+def publish_progress(video_id, stage, state, percent=None, speed=None, eta=None):
+    """
+    Store the progress of one stage in the video's Redis hash.
+    """
+    key = progress_key(video_id)
+    connection = get_redis_connection("default")
+
+    pipeline = connection.pipeline()
+    pipeline.hset(
+        key,
+        stage,
+        json.dumps(
+            {
+                "state": state,
+                "percent": percent,
+                "speed": speed,
+                "eta": eta,
+                "updated_at": time.time(),
+            }
+        ),
+    )
+    pipeline.expire(key, PROGRESS_TIMEOUT)
+    pipeline.execute()
+
+
+def get_progress(video_id):
+    """
+    Return the progress of all stages of a video keyed by stage name.
+    """
+    stages = get_redis_connection("default").hgetall(progress_key(video_id))
+    return {
+        stage.decode(): json.loads(value) for stage, value in stages.items()
+    }
+
+
+def progress_key(video_id):
+    """
+    Return the Redis key holding the progress hash of a video.
+    """
+    return cache.make_key(f"video_progress:{video_id}")
+
+
+def parse_out_time(block):
+    """
+    Return the encoded output position in seconds of a progress block.
+    """
+    try:
+        return int(block["out_time_us"]) / 1_000_000
+    except (KeyError, ValueError):
+        return None
+
+
+def parse_speed(value):
+    """
+    Convert an ffmpeg speed such as "1.5x" to a float.
+    """
+    try:
+        return float(value.rstrip("x"))
+    except (AttributeError, ValueError):
+        return None
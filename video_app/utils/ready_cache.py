@@ -0,0 +1,122 @@
+"""
+Two-tier cache of which videos are ready to play.
+
+Every playlist and segment request checks that its video is ready.
+The answer is looked up in a small in-process LRU with a short TTL,
+then in the Redis cache, and only then in the database. Saving or
+deleting a video clears its Redis entry and the LRU entry of the
+current process. Other processes pick up the change once their local
+entry expires, so VIDEO_READY_LOCAL_TTL bounds how stale they can be.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+
+from video_app.models import Video
+from .shared_stats import SharedCounters
+
+STATS_FIELDS = ("local_hits", "redis_hits", "misses")
+
+
+class LocalTTLCache:
+    """
+    Thread-safe LRU mapping whose entries expire after `ttl` seconds.
+    """
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Return (found, value) for a key that has not expired yet.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return False, None
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self.entries[key]
+                return False, None
+            self.entries.move_to_end(key)
+            return True, value
+
+    def set(self, key, value):
+        """
+        Store a value and evict the least recently used entries.
+        """
+        with self.lock:
+            self.entries[key] = (value, time.monotonic() + self.ttl)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def delete(self, key):
+        """
+        Remove a key if present.
+        """
+        with self.lock:
+            self.entries.pop(key, None)
+
+
+local_cache = LocalTTLCache(
+    settings.VIDEO_READY_LOCAL_SIZE, settings.VIDEO_READY_LOCAL_TTL
+)
+
+lookup_stats = SharedCounters("video_ready_stats", STATS_FIELDS)
+
+
+def is_video_ready(video_id):
+    """
+    Return whether a video exists and is ready to play.
+    """
+    found, ready = local_cache.get(video_id)
+    if found:
+        lookup_stats.record("local_hits")
+        return ready
+
+    ready = cache.get(ready_key(video_id))
+    if ready is not None:
+        lookup_stats.record("redis_hits")
+    else:
+        lookup_stats.record("misses")
+        ready = Video.objects.filter(id=video_id, status="ready").exists()
+        cache.set(ready_key(video_id), ready, settings.VIDEO_READY_CACHE_TIMEOUT)
+
+    local_cache.set(video_id, ready)
+    return ready
+
+
+def invalidate_video_ready(video_id):
+    """
+    Drop the cached readiness of a video from both tiers.
+    """
+    local_cache.delete(video_id)
+    cache.delete(ready_key(video_id))
+
+
+def ready_key(video_id):
+    """
+    Return the cache key holding the readiness of a video.
+    """
+    return f"video_ready:{video_id}"
+
+
+def get_stats():
+    """
+    Return the lookup counters of all processes and the hit ratio.
+    """
+    stats = lookup_stats.totals()
+
+    total = sum(stats.values())
+    hits = stats["local_hits"] + stats["redis_hits"]
+    stats["lookups"] = total
+    stats["hit_ratio"] = round(hits / total, 4) if total else None
+    return stats
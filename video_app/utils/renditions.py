@@ -0,0 +1,42 @@
+"""
+Utilities for the HLS rendition ladder.
+
+Shared by the conversion tasks, which encode the ladder, and the API
+serializers, which list the resolutions a video offers.
+"""
+
+# Standard ffmpeg scales for target resolutions
+RESOLUTIONS = {
+    "480": "854:480",
+    "720": "1280:720",
+    "1080": "1920:1080",
+}
+
+
+def get_rendition_ladder(video):
+    """
+    Return the configured resolutions that do not upscale the source.
+
+    The lowest resolution is always kept, so even small sources get
+    one rendition. Without probed dimensions the full ladder is used.
+    """
+    return rendition_ladder(video.height)
+
+
+def rendition_ladder(height):
+    """
+    Return the rendition ladder of a source `height` pixels high.
+    """
+    if not height:
+        return dict(RESOLUTIONS)
+
+    ladder = {
+        resolution: scale
+        for resolution, scale in RESOLUTIONS.items()
+        if int(resolution) <= height
+    }
+    if not ladder:
+        lowest = min(RESOLUTIONS, key=int)
+        ladder[lowest] = RESOLUTIONS[lowest]
+
+    return ladder
@@ -0,0 +1,70 @@
+"""
+Utilities for the PostgreSQL full-text search over videos.
+
+Every video stores a weighted tsvector of its title (A), description
+(B) and category (C), kept up to date by a post_save signal and backed
+by a GIN index. Searches match every word of the input as a prefix, so
+results appear while the user is still typing, and are ordered by
+ts_rank.
+"""
+
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db.models import F
+
+from video_app.models import Video
+
+# Text search configuration of the stored vectors and of the queries
+SEARCH_CONFIG = "english"
+
+# Words of a search input; everything else, including tsquery
+# operators, is dropped
+SEARCH_TERM = re.compile(r"[^\W_]+")
+
+
+def search_vector():
+    """
+    Return the expression computing a video's weighted search vector.
+    """
+    return (
+        SearchVector("title", weight="A", config=SEARCH_CONFIG)
+        + SearchVector("description", weight="B", config=SEARCH_CONFIG)
+        + SearchVector("category", weight="C", config=SEARCH_CONFIG)
+    )
+
+
+def update_search_vector(video_id):
+    """
+    Recompute the stored search vector of a video in the database.
+    """
+    Video.objects.filter(id=video_id).update(search_vector=search_vector())
+
+
+def prefix_query(text):
+    """
+    Return a query matching every word of `text` as a prefix, or None.
+    """
+    terms = SEARCH_TERM.findall(text)
+    if not terms:
+        return None
+    return SearchQuery(
+        " & ".join(f"{term}:*" for term in terms),
+        search_type="raw",
+        config=SEARCH_CONFIG,
+    )
+
+
+def search_videos(queryset, text):
+    """
+    Filter a video queryset by a search text, best matches first.
+    """
+    query = prefix_query(text)
+    if query is None:
+        return queryset.none()
+
+    return (
+        queryset.filter(search_vector=query)
+        .annotate(rank=SearchRank(F("search_vector"), query))
+        .order_by("-rank", "-created_at", "-id")
+    )
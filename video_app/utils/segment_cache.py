@@ -0,0 +1,324 @@
+"""
+Byte-budgeted cache of hot segment bodies.
+
+Segment traffic is heavily skewed towards the openings of new
+releases. With VIDEO_SEGMENT_CACHE set, segments served by Django are
+kept in an LRU bounded by VIDEO_SEGMENT_CACHE_BYTES, either in the
+memory of each process ("local") or in Redis, shared by all processes
+("redis"). Hits are answered without a disk read.
+
+Entries are keyed by the content hash of the manifest index, so a
+re-published video never serves stale bytes and needs no invalidation.
+A missed segment is only admitted if every policy of
+VIDEO_SEGMENT_CACHE_ADMISSION agrees, checked in the configured order.
+"""
+
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django_redis import get_redis_connection
+
+from .ready_cache import LocalTTLCache
+from .shared_stats import SharedCounters
+
+STATS_FIELDS = (
+    "hits",
+    "misses",
+    "admissions",
+    "rejections",
+    "evictions",
+    "evicted_bytes",
+)
+
+SEGMENT_NUMBER = re.compile(r"index(\d+)\.ts")
+
+# Segments whose request counts the "local" store tracks for "repeat_hits"
+HIT_COUNTER_SIZE = 65536
+
+# Stores a segment in Redis and evicts the least recently used entries
+# until the total size fits the budget, atomically for all processes.
+# KEYS: LRU sorted set, size hash, total bytes; ARGV: member, content,
+# timestamp, budget, data key prefix. Returns [evictions, evicted bytes].
+REDIS_ADD_SCRIPT = """
+local lru, sizes, total = KEYS[1], KEYS[2], KEYS[3]
+local member, content, prefix = ARGV[1], ARGV[2], ARGV[5]
+local now, budget = tonumber(ARGV[3]), tonumber(ARGV[4])
+
+redis.call("ZADD", lru, now, member)
+if redis.call("HSETNX", sizes, member, #content) == 0 then
+    return {0, 0}
+end
+redis.call("SET", prefix .. member, content)
+local used = redis.call("INCRBY", total, #content)
+
+local evictions, evicted_bytes = 0, 0
+while used > budget do
+    local oldest = redis.call("ZRANGE", lru, 0, 0)[1]
+    if not oldest then
+        break
+    end
+    local size = tonumber(redis.call("HGET", sizes, oldest) or "0")
+    redis.call("ZREM", lru, oldest)
+    redis.call("HDEL", sizes, oldest)
+    redis.call("DEL", prefix .. oldest)
+    used = redis.call("DECRBY", total, size)
+    evictions = evictions + 1
+    evicted_bytes = evicted_bytes + size
+end
+return {evictions, evicted_bytes}
+"""
+
+
+class LocalSegmentStore:
+    """
+    Byte-budgeted LRU of segment bodies in the memory of this process.
+    """
+
+    def __init__(self, budget):
+        self.budget = budget
+        self.entries = OrderedDict()
+        self.used = 0
+        self.lock = threading.Lock()
+        self.request_counts = LocalTTLCache(
+            HIT_COUNTER_SIZE, settings.VIDEO_SEGMENT_CACHE_HIT_WINDOW
+        )
+
+    def get(self, key):
+        """
+        Return the cached body of a segment, or None.
+        """
+        with self.lock:
+            content = self.entries.get(key)
+            if content is not None:
+                self.entries.move_to_end(key)
+            return content
+
+    def add(self, key, content):
+        """
+        Store a segment body and return (evictions, evicted bytes).
+        """
+        evictions = evicted_bytes = 0
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                return 0, 0
+            self.entries[key] = content
+            self.used += len(content)
+            while self.used > self.budget and self.entries:
+                _, evicted = self.entries.popitem(last=False)
+                self.used -= len(evicted)
+                evictions += 1
+                evicted_bytes += len(evicted)
+        return evictions, evicted_bytes
+
+    def count_request(self, key):
+        """
+        Count a request for a segment and return its count in the window.
+        """
+        found, count = self.request_counts.get(key)
+        count = count + 1 if found else 1
+        self.request_counts.set(key, count)
+        return count
+
+    def usage(self):
+        """
+        Return the bytes and entries held by this process.
+        """
+        with self.lock:
+            return {"bytes": self.used, "items": len(self.entries)}
+
+
+class RedisSegmentStore:
+    """
+    Byte-budgeted LRU of segment bodies in Redis, shared by all processes.
+    """
+
+    def __init__(self, budget):
+        self.budget = budget
+        self.lru_key = cache.make_key("segment_cache:lru")
+        self.sizes_key = cache.make_key("segment_cache:sizes")
+        self.total_key = cache.make_key("segment_cache:bytes")
+        self.data_prefix = cache.make_key("segment_cache:data:")
+        self.add_script = None
+
+    @property
+    def client(self):
+        """
+        Return the raw Redis client of the default cache.
+        """
+        return get_redis_connection("default")
+
+    def get(self, key):
+        """
+        Return the cached body of a segment and mark it as recently used.
+        """
+        pipeline = self.client.pipeline()
+        pipeline.get(self.data_prefix + key)
+        pipeline.zadd(self.lru_key, {key: time.time()}, xx=True)
+        content, _ = pipeline.execute()
+        return content
+
+    def add(self, key, content):
+        """
+        Store a segment body and return (evictions, evicted bytes).
+        """
+        if self.add_script is None:
+            self.add_script = self.client.register_script(REDIS_ADD_SCRIPT)
+        evictions, evicted_bytes = self.add_script(
+            keys=[self.lru_key, self.sizes_key, self.total_key],
+            args=[key, content, time.time(), self.budget, self.data_prefix],
+        )
+        return int(evictions), int(evicted_bytes)
+
+    def count_request(self, key):
+        """
+        Count a request for a segment and return its count in the window.
+        """
+        counter_key = cache.make_key(f"segment_cache:requests:{key}")
+        pipeline = self.client.pipeline()
+        pipeline.incr(counter_key)
+        pipeline.expire(counter_key, settings.VIDEO_SEGMENT_CACHE_HIT_WINDOW)
+        count, _ = pipeline.execute()
+        return count
+
+    def usage(self):
+        """
+        Return the bytes and entries held in Redis.
+        """
+        pipeline = self.client.pipeline()
+        pipeline.get(self.total_key)
+        pipeline.zcard(self.lru_key)
+        used, items = pipeline.execute()
+        return {"bytes": int(used or 0), "items": items}
+
+
+def admit_always(store, segment, key):
+    """
+    Admit every segment that fits the item size limit.
+    """
+    return True
+
+
+def admit_first_segments(store, segment, key):
+    """
+    Admit the segments of a video's opening.
+
+    Only numbered MPEG-TS segments qualify; a single-file fMP4
+    rendition is never an opening.
+    """
+    match = SEGMENT_NUMBER.fullmatch(segment)
+    return (
+        match is not None
+        and int(match.group(1)) < settings.VIDEO_SEGMENT_CACHE_FIRST_SEGMENTS
+    )
+
+
+def admit_repeat_hits(store, segment, key):
+    """
+    Admit a segment once it was requested often enough within the window.
+
+    Keeps segments requested by a single viewer from displacing
+    popular ones.
+    """
+    return store.count_request(key) >= settings.VIDEO_SEGMENT_CACHE_MIN_HITS
+
+
+ADMISSION_POLICIES = {
+    "always": admit_always,
+    "first_segments": admit_first_segments,
+    "repeat_hits": admit_repeat_hits,
+}
+
+STORES = {
+    "local": LocalSegmentStore,
+    "redis": RedisSegmentStore,
+}
+
+
+def create_store():
+    """
+    Return the configured segment store, or None if the cache is disabled.
+    """
+    backend = settings.VIDEO_SEGMENT_CACHE
+    if not backend:
+        return None
+    if backend not in STORES:
+        raise ImproperlyConfigured(f"Unknown VIDEO_SEGMENT_CACHE '{backend}'.")
+    return STORES[backend](settings.VIDEO_SEGMENT_CACHE_BYTES)
+
+
+def admission_policies():
+    """
+    Return the configured admission policy functions in order.
+    """
+    try:
+        return [
+            ADMISSION_POLICIES[name.strip()]
+            for name in settings.VIDEO_SEGMENT_CACHE_ADMISSION
+            if name.strip()
+        ]
+    except KeyError as error:
+        raise ImproperlyConfigured(
+            f"Unknown VIDEO_SEGMENT_CACHE_ADMISSION policy {error}."
+        )
+
+
+store = create_store()
+policies = admission_policies()
+segment_stats = SharedCounters("video_segment_cache_stats", STATS_FIELDS)
+
+
+def cached_segment(segment, path, entry):
+    """
+    Return the body of a segment from the hot cache, or None.
+
+    `entry` is the segment's manifest index entry. On a miss, an
+    admitted segment is read from disk into the cache and returned.
+    None means the caller streams the file as usual, which is always
+    the case if the cache is disabled or the proxy delivers files.
+    """
+    if store is None or settings.VIDEO_DELIVERY_MODE in ("nginx", "sendfile"):
+        return None
+
+    size, _, key = entry
+    content = store.get(key)
+    if content is not None:
+        segment_stats.record("hits")
+        return content
+
+    segment_stats.record("misses")
+    if size > settings.VIDEO_SEGMENT_CACHE_MAX_ITEM_BYTES or not all(
+        policy(store, segment, key) for policy in policies
+    ):
+        segment_stats.record("rejections")
+        return None
+
+    content = path.read_bytes()
+    evictions, evicted_bytes = store.add(key, content)
+    segment_stats.record("admissions")
+    if evictions:
+        segment_stats.record("evictions", evictions)
+        segment_stats.record("evicted_bytes", evicted_bytes)
+    return content
+
+
+def get_stats():
+    """
+    Return the counters of all processes, the hit ratio and current usage.
+
+    Usage of the "local" store covers only the answering process.
+    """
+    stats = segment_stats.totals()
+
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_ratio"] = round(stats["hits"] / lookups, 4) if lookups else None
+    stats["backend"] = settings.VIDEO_SEGMENT_CACHE or None
+    stats["budget_bytes"] = settings.VIDEO_SEGMENT_CACHE_BYTES
+    if store is not None:
+        stats.update(store.usage())
+    return stats
@@ -0,0 +1,68 @@
+"""
+Counters shared by all processes through a Redis hash.
+
+Hot paths count into a per-process dict, which is added to the Redis
+hash at most every `flush_interval` seconds, so counting never costs
+a round trip per request.
+"""
+
+import threading
+import time
+
+from django.core.cache import cache
+from django_redis import get_redis_connection
+
+
+class SharedCounters:
+    """
+    Named integer counters aggregated across processes in Redis.
+    """
+
+    def __init__(self, name, fields, flush_interval=10):
+        self.name = name
+        self.fields = fields
+        self.flush_interval = flush_interval
+        self.pending = dict.fromkeys(fields, 0)
+        self.lock = threading.Lock()
+        self.last_flush = time.monotonic()
+
+    def record(self, field, count=1):
+        """
+        Count an event and periodically flush the counters to Redis.
+        """
+        with self.lock:
+            self.pending[field] += count
+            due = time.monotonic() - self.last_flush >= self.flush_interval
+
+        if due:
+            self.flush()
+
+    def flush(self):
+        """
+        Add the counters of this process to the shared Redis hash.
+        """
+        with self.lock:
+            counts = dict(self.pending)
+            for field in self.fields:
+                self.pending[field] = 0
+            self.last_flush = time.monotonic()
+
+        pipeline = get_redis_connection("default").pipeline()
+        for field, count in counts.items():
+            if count:
+                pipeline.hincrby(self.key(), field, count)
+        pipeline.execute()
+
+    def totals(self):
+        """
+        Return the counters of all processes.
+        """
+        self.flush()
+        stored = get_redis_connection("default").hgetall(self.key())
+        return {field: int(stored.get(field.encode(), 0)) for field in self.fields}
+
+    def key(self):
+        """
+        Return the Redis key of the shared hash.
+        """
+        return cache.make_key(self.name)
@@ -0,0 +1,126 @@
+"""
+Utilities for picking video thumbnails and their responsive derivatives.
+
+Candidate frames are taken from keyframes at fixed positions of the
+video by seeking, so only a handful of frames has to be decoded.
+The chosen frame is then resized into modern image formats.
+"""
+
+import secrets
+
+from PIL import Image, features
+
+# Pillow format names and save options of the derivative formats
+DERIVATIVE_FORMATS = {
+    "webp": ("WEBP", {"quality": 80, "method": 4}),
+    "avif": ("AVIF", {"quality": 60}),
+}
+
+# File name of the chosen frame in the thumbnails directory
+THUMBNAIL_NAME = "thumbnail.jpg"
+
+# Relative positions of the candidate keyframes within the video
+CANDIDATE_POSITIONS = (0.1, 0.25, 0.4, 0.55, 0.7)
+
+
+def candidate_timestamps(duration):
+    """
+    Return the seek positions in seconds of all thumbnail candidates.
+    """
+    if not duration:
+        return [0.0]
+    return [round(duration * position, 3) for position in CANDIDATE_POSITIONS]
+
+
+def build_candidates_command(source_path, timestamps, target_paths):
+    """
+    Build one ffmpeg command extracting a keyframe near each timestamp.
+
+    Every timestamp is opened as its own input that seeks to the
+    nearest keyframe and decodes only keyframes.
+    """
+    cmd = ["ffmpeg", "-y"]
+    for timestamp in timestamps:
+        cmd += [
+            "-skip_frame",
+            "nokey",
+            "-noaccurate_seek",
+            "-ss",
+            f"{timestamp:.3f}",
+            "-i",
+            str(source_path),
+        ]
+
+    for index, target_path in enumerate(target_paths):
+        cmd += [
+            "-map",
+            f"{index}:v:0",
+            "-frames:v",
+            "1",
+            "-q:v",
+            "2",
+            str(target_path),
+        ]
+
+    return cmd
+
+
+def pick_best_frame(paths):
+    """
+    Return the candidate image with the most visual information.
+
+    Image entropy filters out black, faded or single-colour frames.
+    """
+    best_path = None
+    best_entropy = -1.0
+    for path in paths:
+        if not path.exists():
+            continue
+        with Image.open(path) as image:
+            entropy = image.entropy()
+        if entropy > best_entropy:
+            best_path, best_entropy = path, entropy
+    return best_path
+
+
+def create_derivatives(source_path, target_dir, widths, formats):
+    """
+    Write resized copies of a thumbnail for every width and format.
+
+    Widths above the source width and formats the installed Pillow
+    cannot encode are skipped. Returns the derivative map stored on
+    the video: a random version token plus the widths per format.
+    """
+    derivatives = {"version": secrets.token_hex(4)}
+
+    with Image.open(source_path) as image:
+        image = image.convert("RGB")
+        for image_format in formats:
+            pillow_format, options = DERIVATIVE_FORMATS[image_format]
+            if not features.check(image_format):
+                continue
+
+            created = []
+            for width in sorted(widths):
+                if width > image.width:
+                    continue
+                height = max(1, round(image.height * width / image.width))
+                resized = image.resize((width, height), Image.Resampling.LANCZOS)
+                resized.save(
+                    target_dir / derivative_name(width, image_format),
+                    pillow_format,
+                    **options,
+                )
+                created.append(width)
+
+            if created:
+                derivatives[image_format] = created
+
+    return derivatives
+
+
+def derivative_name(width, image_format):
+    """
+    Return the file name of a thumbnail derivative.
+    """
+    return f"thumbnail_{width}.{image_format}"
@@ -0,0 +1,92 @@
+"""
+Utilities for trickplay (scrubbing preview) sprite sheets.
+
+Preview frames are sampled at a fixed interval in a single decode,
+tiled into JPEG sprite sheets and indexed by a WebVTT file whose cues
+point at the tile of each interval via media fragments.
+"""
+
+import math
+
+# Number of preview tiles per sprite sheet row and column
+SPRITE_COLUMNS = 10
+SPRITE_ROWS = 10
+
+
+def tile_size(width, height, tile_width):
+    """
+    Return the even-sized tile dimensions for a source aspect ratio.
+    """
+    if not width or not height:
+        return tile_width, round(tile_width * 9 / 16 / 2) * 2
+    return tile_width, max(2, round(tile_width * height / width / 2) * 2)
+
+
+def build_sprite_command(source_path, target_dir, interval, tile_width, tile_height):
+    """
+    Build the ffmpeg command writing all sprite sheets in one decode.
+    """
+    return [
+        "ffmpeg",
+        "-y",
+        "-i",
+        str(source_path),
+        "-an",
+        "-vf",
+        (
+            f"fps=1/{interval},"
+            f"scale={tile_width}:{tile_height},"
+            f"tile={SPRITE_COLUMNS}x{SPRITE_ROWS}"
+        ),
+        "-q:v",
+        "3",
+        "-start_number",
+        "0",
+        str(target_dir / "sprite_%d.jpg"),
+    ]
+
+
+def sprite_duration(sprite_count, interval):
+    """
+    Return the duration covered by `sprite_count` full sprite sheets.
+
+    Used when the source duration is unknown. The last sheet is usually
+    only partly filled, but players never show cues past the end of
+    the media.
+    """
+    return sprite_count * SPRITE_COLUMNS * SPRITE_ROWS * interval
+
+
+def write_webvtt(target_path, duration, interval, tile_width, tile_height):
+    """
+    Write the WebVTT index mapping every interval to its sprite tile.
+    """
+    tiles_per_sheet = SPRITE_COLUMNS * SPRITE_ROWS
+    count = max(1, math.ceil(duration / interval))
+
+    lines = ["WEBVTT", ""]
+    for index in range(count):
+        start = index * interval
+        end = min((index + 1) * interval, duration)
+        sheet, position = divmod(index, tiles_per_sheet)
+        row, column = divmod(position, SPRITE_COLUMNS)
+
+        lines += [
+            f"{format_timestamp(start)} --> {format_timestamp(end)}",
+            f"sprite_{sheet}.jpg#xywh="
+            f"{column * tile_width},{row * tile_height},{tile_width},{tile_height}",
+            "",
+        ]
+
+    target_path.write_text("\n".join(lines))
+
+
+def format_timestamp(seconds):
+    """
+    Format seconds as a WebVTT timestamp (HH:MM:SS.mmm).
+    """
+    milliseconds = round(seconds * 1000)
+    hours, milliseconds = divmod(milliseconds, 3_600_000)
+    minutes, milliseconds = divmod(milliseconds, 60_000)
+    seconds, milliseconds = divmod(milliseconds, 1000)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}.{milliseconds:03d}"
@@ -0,0 +1,82 @@
+"""
+Utilities for chunked, resumable video uploads.
+
+Chunks are streamed from the request directly into the final
+original directory of the video, so the upload is never buffered or
+copied again. The content hash is computed once by the conversion job.
+"""
+
+import fcntl
+import hashlib
+from pathlib import Path
+
+from django.conf import settings
+from django.utils.text import get_valid_filename
+
+# Bytes read from the request stream per write
+UPLOAD_BUFFER_SIZE = 1024 * 1024
+
+
+def original_name(video_id, filename):
+    """
+    Return the storage name of an upload inside the final video layout.
+    """
+    return f"videos/video_{video_id}/original/{get_valid_filename(filename)}"
+
+
+def upload_path(video):
+    """
+    Return the absolute path the upload of a video is written to.
+    """
+    return Path(settings.MEDIA_ROOT) / video.original_file.name
+
+
+def current_offset(video):
+    """
+    Return the number of bytes of the upload already stored on disk.
+    """
+    path = upload_path(video)
+    return path.stat().st_size if path.exists() else 0
+
+
+def append_chunk(video, stream, offset, length):
+    """
+    Append up to `length` bytes from `stream` to the upload of a video.
+
+    Returns the new offset, or None if `offset` does not match the bytes
+    on disk or another request is writing the same upload. A client that
+    disconnects mid-chunk keeps everything written so far and resumes
+    from the current offset.
+    """
+    path = upload_path(video)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    with path.open("ab") as destination:
+        try:
+            fcntl.flock(destination, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return None
+
+        if destination.tell() != offset:
+            return None
+
+        remaining = length
+        while remaining > 0:
+            data = stream.read(min(UPLOAD_BUFFER_SIZE, remaining))
+            if not data:
+                break
+            destination.write(data)
+            remaining -= len(data)
+
+    return path.stat().st_size
+
+
+def content_hash(path):
+    """
+    Return the hex SHA-256 of a file, read in a single sequential pass.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as source:
+        for block in iter(lambda: source.read(UPLOAD_BUFFER_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()